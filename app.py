@@ -3,14 +3,30 @@
 """
 import streamlit as st
 import pandas as pd
+import numpy as np
+import collections
+import hashlib
+import io
+import json
 import os
 import logging
+import queue
+import tempfile
+import threading
+from datetime import datetime
+from typing import IO, Iterator, Optional, Union
 from pathlib import Path
 from src.ocr_extractor import OCRExtractor
 from src.excel_extractor import ExcelExtractor
 from src.data_validator import DataValidator
-from src.recoru_client import RecoruClient
-from src.utils import load_config, calculate_work_hours, build_date_from_components, normalize_time
+from src.recoru_client import RecoruClient, HEADLESS_CHROME_ARGS
+from src.utils import load_config, build_date_from_components, normalize_time
+
+# blake3がインストールされていればファイルのハッシュ計算に使う（未インストール時はhashlib.blake2b）
+try:
+    import blake3
+except ImportError:
+    blake3 = None
 
 # ログ設定
 os.makedirs('logs', exist_ok=True)
@@ -24,6 +40,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# OCR結果のディスクキャッシュ（同じファイルの再アップロード時にOCRを省略する）
+# キャッシュするのはOCRしたテキストのみで、勤怠データへのパースは毎回行う（パース処理の修正を反映するため）
+OCR_CACHE_DIR = Path('cache')
+OCR_CACHE_MAX_ENTRIES = 64
+# 画像の前処理などOCRのテキストが変わる修正をした場合は上げる（古いキャッシュを使わないため）
+OCR_CACHE_VERSION = 2
+
 # ページ設定
 st.set_page_config(
     page_title="勤怠記録自動入力アプリ",
@@ -42,9 +65,36 @@ if 'debug_info' not in st.session_state:
     st.session_state.debug_info = None
 
 
-def extract_from_file(file_path: str, file_type: str, poppler_path: str = "", debug: bool = False) -> tuple:
+@st.cache_resource(show_spinner=False)
+def get_ocr_extractor(poppler_path: str = None, pdf_dpi: int = 150) -> OCRExtractor:
+    """
+    OCRExtractorを取得（EasyOCRのモデル読み込みはプロセスごとに1回だけ行う）
+    
+    Args:
+        poppler_path: Popplerのbinディレクトリパス
+        pdf_dpi: PDFを画像に変換する際の解像度
+    
+    Returns:
+        OCRExtractorのインスタンス
+    """
+    logger.info(f"OCRExtractorを初期化: poppler_path={poppler_path or 'None'}, pdf_dpi={pdf_dpi}")
+    return OCRExtractor(use_easyocr=True, poppler_path=poppler_path, pdf_dpi=pdf_dpi)
+
+
+@st.cache_resource(show_spinner=False)
+def get_excel_extractor() -> ExcelExtractor:
     """
-    ファイルから勤怠データを抽出
+    ExcelExtractorを取得（プロセス内で共有）
+    
+    Returns:
+        ExcelExtractorのインスタンス
+    """
+    return ExcelExtractor()
+
+
+def extract_from_file(file_path: Union[str, IO[bytes]], file_type: str, poppler_path: str = "", debug: bool = False, pdf_dpi: int = 150) -> tuple:
+    """
+    ファイルから勤怠データを抽出（Excelの場合はファイルオブジェクトも指定可能）
     
     Returns:
         (records, debug_info): レコードリストとデバッグ情報のタプル
@@ -54,69 +104,53 @@ def extract_from_file(file_path: str, file_type: str, poppler_path: str = "", de
     
     if file_type in ['image', 'pdf']:
         logger.info(f"OCR抽出を使用: use_easyocr=True, poppler_path={poppler_path or 'None'}")
-        extractor = OCRExtractor(use_easyocr=True, poppler_path=poppler_path or None)
+        extractor = get_ocr_extractor(poppler_path or None, pdf_dpi)
         if file_type == 'pdf':
             logger.info("PDFファイルの処理を開始")
             debug_info['file_type'] = 'pdf'
-            # PDFの場合は各ページのテキストを取得（デバッグモードの場合）
-            if debug:
-                try:
-                    logger.info("PDFデバッグ情報の取得を開始")
-                    from pdf2image import convert_from_path
-                    kwargs = {}
-                    if poppler_path:
-                        kwargs["poppler_path"] = poppler_path
-                    # デバッグ情報取得のため、PDFを画像に変換（抽出処理の前に実行）
-                    images = convert_from_path(file_path, **kwargs)
-                    logger.info(f"PDFを画像に変換: {len(images)}ページ")
-                    page_texts = []
-                    for i, image in enumerate(images):
-                        logger.info(f"ページ {i+1}/{len(images)}のテキスト抽出中...")
-                        temp_path = f"temp_pdf_page_debug_{i}.png"
-                        image.save(temp_path, 'PNG')
-                        try:
-                            text = extractor.extract_text(temp_path)
-                            logger.info(f"ページ {i+1}のテキスト抽出完了: {len(text)}文字")
-                            logger.info(f"ページ {i+1}の抽出テキスト内容:\n{text}")
-                            page_texts.append({
-                                'page': i + 1,
-                                'text': text
-                            })
-                        finally:
-                            if os.path.exists(temp_path):
-                                os.remove(temp_path)
-                    debug_info['pdf_pages'] = len(images)
-                    debug_info['page_texts'] = page_texts
-                    logger.info("PDFデバッグ情報の取得完了")
-                except Exception as e:
-                    logger.error(f"PDFデバッグ情報の取得エラー: {e}", exc_info=True)
-                    debug_info['pdf_debug_error'] = str(e)
-            
-            # 実際のデータ抽出（デバッグ情報取得後）
-            records = extractor.extract_from_pdf(file_path)
+            # PDFは1回だけ画像に変換し、キャッシュ済みのReaderで全ページをまとめてOCRする
+            images = extractor.convert_pdf_to_images(file_path)
+            logger.info(f"PDFを画像に変換: {len(images)}ページ")
+            # ページ画像はPNGに書き出さず、numpy配列のまま渡す
+            pages = [OCRExtractor.image_to_array(image) for image in images]
+            texts = extractor.extract_texts(pages)
+
+            page_texts = []
+            for i, text in enumerate(texts):
+                logger.info(f"ページ {i+1}のテキスト抽出完了: {len(text)}文字")
+                if debug:
+                    logger.info(f"ページ {i+1}の抽出テキスト内容:\n{text}")
+                page_texts.append({
+                    'page': i + 1,
+                    'text': text
+                })
+            debug_info['pdf_pages'] = len(images)
+            debug_info['page_texts'] = page_texts
+
+            # OCR済みのテキストからデータ抽出（PDFの再OCRは行わない）
+            records = extractor.extract_from_pdf(file_path, precomputed_texts=texts)
             logger.info(f"PDF処理完了: {len(records)}件のレコードを抽出")
         else:
             # 画像の場合、抽出されたテキストを取得
             logger.info("画像ファイルの処理を開始")
+            # OCRは1回だけ行い、テキストはキャッシュ・デバッグ表示用に残す
+            text = extractor.extract_text(file_path)
+            logger.info(f"OCRテキスト抽出完了: {len(text)}文字")
             if debug:
-                logger.info("OCRテキスト抽出中...")
-                text = extractor.extract_text(file_path)
-                logger.info(f"OCRテキスト抽出完了: {len(text)}文字")
                 logger.info(f"抽出テキスト内容:\n{text}")
-                debug_info['extracted_text'] = text
-            records = extractor.extract_from_image(file_path)
+            debug_info['extracted_text'] = text
+            records = extractor.parse_attendance_data(text)
             logger.info(f"画像処理完了: {len(records)}件のレコードを抽出")
             debug_info['file_type'] = 'image'
     elif file_type == 'excel':
         logger.info("Excelファイルの処理を開始")
-        extractor = ExcelExtractor()
-        records = extractor.extract_from_excel(file_path)
+        extractor = get_excel_extractor()
+        # 抽出時に読み込んだDataFrameをデバッグ表示にも使う（ブックの再読み込みをしない）
+        records, df = extractor.extract_from_excel(file_path, return_df=True)
         logger.info(f"Excel処理完了: {len(records)}件のレコードを抽出")
         debug_info['file_type'] = 'excel'
         if debug:
             # Excelの列情報を取得
-            import pandas as pd
-            df = pd.read_excel(file_path)
             column_mapping = extractor.detect_columns(df)
             debug_info['excel_columns'] = list(df.columns)
             debug_info['column_mapping'] = column_mapping
@@ -129,6 +163,231 @@ def extract_from_file(file_path: str, file_type: str, poppler_path: str = "", de
     return records, debug_info
 
 
+def ocr_cache_key(file_bytes: bytes, file_type: str, pdf_dpi: int, ocr_engine: str) -> str:
+    """
+    OCR結果キャッシュのキーを作成（ファイル内容のハッシュ＋抽出条件）
+    
+    Args:
+        file_bytes: ファイルの内容
+        file_type: ファイルタイプ（image, pdf）
+        pdf_dpi: PDFを画像に変換する際の解像度
+        ocr_engine: 使用したOCRエンジン（easyocr, tesseract）
+    
+    Returns:
+        キャッシュキー
+    """
+    if blake3 is not None:
+        digest = blake3.blake3(file_bytes).hexdigest()
+    else:
+        digest = hashlib.blake2b(file_bytes).hexdigest()
+    # EasyOCRの初期化に失敗してTesseractで読んだ結果を、EasyOCRが使えるようになった後に使わないようエンジンもキーに含める
+    return f"{digest}_{file_type}_{pdf_dpi}_{ocr_engine}_v{OCR_CACHE_VERSION}"
+
+
+def load_ocr_cache(key: str) -> Optional[tuple]:
+    """
+    ディスクキャッシュからOCR結果を読み込む
+    
+    Args:
+        key: キャッシュキー
+    
+    Returns:
+        (ページごとのOCRテキストのリスト, debug_info)のタプル、キャッシュがない場合はNone
+    """
+    cache_path = OCR_CACHE_DIR / f"{key}.json"
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        # 最近使ったものを残すため、更新日時を使用時刻にする
+        os.utime(cache_path)
+        return cached['texts'], cached['debug_info']
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"OCRキャッシュの読み込みに失敗: {cache_path}: {e}")
+        return None
+
+
+def save_ocr_cache(key: str, texts: list, debug_info: dict) -> None:
+    """
+    OCR結果をディスクキャッシュに保存し、古いキャッシュを削除する
+    
+    Args:
+        key: キャッシュキー
+        texts: ページごとのOCRテキストのリスト
+        debug_info: デバッグ情報
+    """
+    try:
+        OCR_CACHE_DIR.mkdir(exist_ok=True)
+        cache_path = OCR_CACHE_DIR / f"{key}.json"
+        # 書き込み途中のファイルを読まないよう、一時ファイルに書いてから置き換える
+        # （Streamlitのセッションは同じプロセスの別スレッドで動くため、スレッドごとに別の一時ファイルにする）
+        temp_path = cache_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'texts': texts, 'debug_info': debug_info}, f, ensure_ascii=False)
+        os.replace(temp_path, cache_path)
+        
+        # 上限を超えた分は最後に使われた日時が古いものから削除
+        entries = sorted(OCR_CACHE_DIR.glob("*.json"), key=lambda path: path.stat().st_mtime, reverse=True)
+        for old_path in entries[OCR_CACHE_MAX_ENTRIES:]:
+            old_path.unlink(missing_ok=True)
+    except OSError as e:
+        logger.warning(f"OCRキャッシュの保存に失敗: {e}")
+
+
+@st.cache_data(show_spinner=False, max_entries=8, ttl=24 * 60 * 60)
+def cached_extract(file_bytes: bytes, file_name: str, file_type: str, poppler_path: str, pdf_dpi: int) -> tuple:
+    """
+    アップロードされたファイルから勤怠データを抽出（ファイル内容をキーにキャッシュ）
+    
+    Args:
+        file_bytes: アップロードされたファイルの内容
+        file_name: ファイル名
+        file_type: ファイルタイプ（image, pdf, excel）
+        poppler_path: Popplerのbinディレクトリパス
+        pdf_dpi: PDFを画像に変換する際の解像度
+    
+    Returns:
+        (records, debug_info): レコードリストとデバッグ情報のタプル
+    """
+    if file_type == 'excel':
+        # Excelはメモリ上のバッファから直接読み込む（一時ファイル不要）
+        return extract_from_file(io.BytesIO(file_bytes), file_type, poppler_path=poppler_path, debug=True, pdf_dpi=pdf_dpi)
+    
+    # 同じ内容のファイルを以前OCRしていれば、ディスクキャッシュのテキストを使う（セッション・再起動をまたいで有効）
+    extractor = get_ocr_extractor(poppler_path or None, pdf_dpi)
+    ocr_engine = 'easyocr' if extractor.use_easyocr and extractor.reader else 'tesseract'
+    cache_key = ocr_cache_key(file_bytes, file_type, pdf_dpi, ocr_engine)
+    cached = load_ocr_cache(cache_key)
+    if cached is not None:
+        logger.info(f"OCRキャッシュを使用: {file_name} ({cache_key})")
+        texts, debug_info = cached
+        return extractor.extract_from_texts(texts), debug_info
+    
+    # OCR（pdf2image / OpenCV）はファイルパスが必要なため一時保存する
+    # セッションごとに専用の一時ディレクトリを使い、終了時にOSの仕組みで確実に削除する
+    # （ファイル名は拡張子のみ引き継ぐ。日本語ファイル名だとcv2.imreadが読めない場合があるため）
+    with tempfile.TemporaryDirectory(prefix="attendance_") as temp_dir:
+        temp_path = Path(temp_dir) / f"upload{Path(file_name).suffix.lower()}"
+        temp_path.write_bytes(file_bytes)
+        records, debug_info = extract_from_file(str(temp_path), file_type, poppler_path=poppler_path, debug=True, pdf_dpi=pdf_dpi)
+    
+    if file_type == 'pdf':
+        texts = [page_info['text'] for page_info in debug_info['page_texts']]
+    else:
+        texts = [debug_info['extracted_text']]
+    save_ocr_cache(cache_key, texts, debug_info)
+    return records, debug_info
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def build_records_dataframe(records: list) -> pd.DataFrame:
+    """
+    レコードのリストから表示用のDataFrameを作成（再描画のたびに作り直さないようキャッシュ）
+    
+    Args:
+        records: 勤怠レコードのリスト
+    
+    Returns:
+        表示用のDataFrame
+    """
+    return pd.DataFrame(records)
+
+
+def input_records_in_background(client: RecoruClient, records: list) -> Iterator[tuple]:
+    """
+    勤怠データの入力をワーカースレッドで実行し、1件終わるごとに結果を返す
+    
+    ブラウザ操作はワーカースレッドだけが行い、呼び出し側（Streamlitのスレッド）は
+    キューから結果を受け取って進捗表示を更新する。
+    停止・再実行でジェネレーターが閉じられた場合は、入力中のレコードが終わった時点でワーカーを止める。
+    
+    Args:
+        client: ログイン済みのRecoruClient
+        records: 入力する勤怠レコードのリスト
+    
+    Yields:
+        (インデックス, レコード, 入力に成功したか)のタプル
+    """
+    result_queue: queue.Queue = queue.Queue()
+    stop_event = threading.Event()
+    
+    def worker():
+        try:
+            for i, record in enumerate(records):
+                if stop_event.is_set():
+                    break
+                result_queue.put((i, record, client.input_attendance(record)))
+        except Exception as e:
+            result_queue.put(e)
+        finally:
+            result_queue.put(None)
+    
+    thread = threading.Thread(target=worker, name="recoru-input", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = result_queue.get()
+            if item is None:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop_event.set()
+        thread.join()
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def build_preview_dataframe(records: list) -> pd.DataFrame:
+    """
+    データ確認タブの編集用DataFrameを作成（勤務時間・日付の表示用列を含む）
+    
+    Args:
+        records: 勤怠レコードのリスト
+    
+    Returns:
+        編集用のDataFrame
+    """
+    df = pd.DataFrame(records)
+    
+    # 勤務時間を計算して追加（表示用、列単位でまとめて計算）
+    if 'start_time' in df.columns and 'end_time' in df.columns:
+        start_dt = pd.to_datetime(df['start_time'], format='%H:%M', errors='coerce')
+        end_dt = pd.to_datetime(df['end_time'], format='%H:%M', errors='coerce')
+        work_hours = (end_dt - start_dt).dt.total_seconds() / 3600
+        # 日をまたぐ場合の処理（calculate_work_hoursと同じく翌日として扱う）
+        work_hours = work_hours.where(work_hours >= 0, work_hours + 24)
+        df['work_hours'] = work_hours.round(2)
+    
+    # 日付文字列を追加（表示用）
+    if 'day' in df.columns:
+        # 行ごとにSeriesを作るdf.applyは遅いため、レコードの辞書にまとめて変換してから計算する
+        now = datetime.now()
+        df['date'] = [
+            build_date_from_components(record, now) or 'N/A'
+            for record in df.to_dict('records')
+        ]
+    
+    return df
+
+
+def normalize_time_column(column: pd.Series) -> tuple:
+    """
+    時刻の列をまとめてHH:MM形式に正規化
+    
+    Args:
+        column: 時刻文字列の列（空文字や欠損値を含む）
+    
+    Returns:
+        (正規化後の列, 形式が不正だった行のマスク)のタプル
+    """
+    raw = column.fillna('').astype(str)
+    present = raw.ne('')
+    normalized = raw.where(present).map(normalize_time, na_action='ignore')
+    return normalized, present & normalized.isna()
+
+
 def main():
     """メイン処理"""
     st.title("📅 勤怠記録自動入力アプリ")
@@ -171,6 +430,7 @@ def main():
                     value=str(ocr_config.get('poppler_path', '') or ''),
                     help="例: C:\\poppler\\Library\\bin（PATHに通している場合は空でOK）"
                 )
+                pdf_dpi = int(ocr_config.get('dpi', 150) or 150)
                 
                 headless_mode = st.checkbox("ヘッドレスモード", value=False)
             except Exception as e:
@@ -179,6 +439,7 @@ def main():
                 login_id = ""
                 password = ""
                 poppler_path = ""
+                pdf_dpi = 150
                 headless_mode = False
         else:
             st.warning("設定ファイルが見つかりません")
@@ -200,8 +461,15 @@ def main():
                 value="",
                 help="例: C:\\poppler\\Library\\bin（PATHに通している場合は空でOK）"
             )
+            pdf_dpi = 150
             headless_mode = st.checkbox("ヘッドレスモード", value=False)
     
+    # OCRモデルを起動時に読み込んでおく（初回の抽出クリック時の待ち時間を減らす。2回目以降はキャッシュ済み）
+    try:
+        get_ocr_extractor(poppler_path or None, pdf_dpi)
+    except Exception as e:
+        logger.warning(f"OCRモデルの事前読み込みに失敗しました: {e}")
+    
     # メインエリア
     tab1, tab2, tab3, tab4 = st.tabs(["📤 ファイル選択", "📊 データ確認", "✅ 検証結果", "🚀 実行"])
     
@@ -218,19 +486,15 @@ def main():
         if file is not None:
             st.success(f"ファイルを読み込みました: {file.name}")
             
-            # ファイルを一時保存
             file_ext = Path(file.name).suffix.lower()
             file_type = 'image' if file_ext in ['.jpg', '.jpeg', '.png'] else 'pdf' if file_ext == '.pdf' else 'excel'
             
-            temp_path = f"temp_{file.name}"
-            with open(temp_path, "wb") as f:
-                f.write(file.getbuffer())
-            
             if st.button("データを抽出", type="primary"):
                 with st.spinner("データを抽出中..."):
                     try:
                         logger.info(f"データ抽出を開始: ファイル={file.name}, タイプ={file_type}")
-                        records, debug_info = extract_from_file(temp_path, file_type, poppler_path=poppler_path, debug=True)
+                        # 同じファイル内容であればキャッシュ済みの抽出結果を再利用する
+                        records, debug_info = cached_extract(file.getvalue(), file.name, file_type, poppler_path or "", pdf_dpi)
                         logger.info(f"抽出完了: {len(records)}件のレコードを抽出")
                         st.session_state.extracted_data = records
                         st.session_state.debug_info = debug_info
@@ -263,8 +527,6 @@ def main():
                                                     height=150,
                                                     key=f"pdf_page_{page_info['page']}"
                                                 )
-                                    elif 'pdf_debug_error' in debug_info:
-                                        st.error(f"PDFデバッグ情報の取得に失敗: {debug_info['pdf_debug_error']}")
                                 
                                 elif debug_info.get('file_type') == 'excel':
                                     st.subheader("Excel列情報")
@@ -282,6 +544,8 @@ def main():
                             # 抽出したレコードの詳細を表示
                             with st.expander("📋 抽出したレコードの詳細", expanded=True):
                                 st.write(f"**総レコード数:** {len(records)}")
+                                # 1レコードごとに描画せず、まとめて1つのテキストとして表示
+                                lines = []
                                 for idx, record in enumerate(records, 1):
                                     day_raw = record.get('day')
                                     try:
@@ -292,7 +556,8 @@ def main():
                                     start = record.get('start_time') or 'なし'
                                     end = record.get('end_time') or 'なし'
                                     status = record.get('status', 'unknown')
-                                    st.write(f"{idx}. 日={day_disp}, 曜={weekday or '？'}, 出勤={start:>5s}, 退勤={end:>5s}, 状態={status}")
+                                    lines.append(f"{idx}. 日={day_disp}, 曜={weekday or '？'}, 出勤={start:>5s}, 退勤={end:>5s}, 状態={status}")
+                                st.text("\n".join(lines))
                         
                         # データ検証
                         logger.info("データ検証を開始")
@@ -302,36 +567,16 @@ def main():
                     except Exception as e:
                         st.error(f"データ抽出エラー: {e}")
                         logger.error(f"データ抽出エラー: {e}", exc_info=True)
-                    finally:
-                        # 一時ファイルを削除
-                        if os.path.exists(temp_path):
-                            os.remove(temp_path)
     
     # タブ2: データ確認
-    with tab2:
+    # フラグメントにして、表の編集などタブ内の操作ではこのタブだけを再実行する
+    @st.fragment
+    def render_data_tab():
         st.header("抽出されたデータ")
         
         if st.session_state.extracted_data:
-            # 編集用のデータフレームを作成
-            df = pd.DataFrame(st.session_state.extracted_data)
-            
-            # 勤務時間を計算して追加（表示用）
-            if 'start_time' in df.columns and 'end_time' in df.columns:
-                df['work_hours'] = df.apply(
-                    lambda row: calculate_work_hours(
-                        row.get('start_time', ''),
-                        row.get('end_time', ''),
-                        '00:00'  # break_timeは不要
-                    ) if row.get('start_time') and row.get('end_time') else None,
-                    axis=1
-                )
-            
-            # 日付文字列を追加（表示用）
-            if 'day' in df.columns:
-                df['date'] = df.apply(
-                    lambda row: build_date_from_components(row.to_dict()) or 'N/A',
-                    axis=1
-                )
+            # 編集用のデータフレームを作成（同じデータならキャッシュを再利用）
+            df = build_preview_dataframe(st.session_state.extracted_data)
             
             # 強調表示用のスタイルを追加
             def highlight_missing(row):
@@ -419,30 +664,35 @@ def main():
             col1, col2 = st.columns([1, 4])
             with col1:
                 if st.button("変更を保存", type="primary"):
-                    # 編集されたデータを元の形式に戻す
-                    edited_records = []
-                    for idx, row in edited_df.iterrows():
-                        # 時刻を正規化
-                        start_time = None
-                        if pd.notna(row['start_time']) and row['start_time'] != '':
-                            start_time = normalize_time(str(row['start_time']))
-                            if start_time is None:
-                                st.warning(f"行 {idx+1}: 出勤時刻の形式が不正です: {row['start_time']}")
-                        
-                        end_time = None
-                        if pd.notna(row['end_time']) and row['end_time'] != '':
-                            end_time = normalize_time(str(row['end_time']))
-                            if end_time is None:
-                                st.warning(f"行 {idx+1}: 退勤時刻の形式が不正です: {row['end_time']}")
-                        
-                        record = {
-                            'day': int(row['day']) if pd.notna(row['day']) else None,
-                            'weekday': row['weekday'] if pd.notna(row['weekday']) else None,
-                            'start_time': start_time,
-                            'end_time': end_time,
-                            'status': row['status'] if pd.notna(row['status']) else 'partial'
-                        }
-                        edited_records.append(record)
+                    # 編集されたデータを元の形式に戻す（列単位でまとめて変換）
+                    start_times, invalid_start = normalize_time_column(edited_df['start_time'])
+                    end_times, invalid_end = normalize_time_column(edited_df['end_time'])
+                    
+                    warnings = [
+                        f"行 {idx+1}: 出勤時刻の形式が不正です: {edited_df.at[idx, 'start_time']}"
+                        for idx in edited_df.index[invalid_start]
+                    ] + [
+                        f"行 {idx+1}: 退勤時刻の形式が不正です: {edited_df.at[idx, 'end_time']}"
+                        for idx in edited_df.index[invalid_end]
+                    ]
+                    if warnings:
+                        # Markdownの改行にするため、行末に半角スペース2つを付けて結合する
+                        st.warning("  \n".join(warnings))
+                    
+                    # 日は整数に切り捨てる（5.5などの入力でInt64への変換が失敗しないように。数値でない値は欠損値）
+                    days = pd.to_numeric(edited_df['day'], errors='coerce').astype('float64')
+                    days = np.trunc(days.where(np.isfinite(days))).astype('Int64')
+                    
+                    edited = pd.DataFrame({
+                        'day': days,
+                        'weekday': edited_df['weekday'],
+                        'start_time': start_times,
+                        'end_time': end_times,
+                        'status': edited_df['status'].fillna('partial'),
+                    })
+                    # 欠損値（NaN / NA）はNoneに揃えてからレコードのリストに変換
+                    edited = edited.astype(object).where(edited.notna(), None)
+                    edited_records = edited.to_dict('records')
                     
                     # セッション状態を更新
                     st.session_state.extracted_data = edited_records
@@ -477,6 +727,9 @@ def main():
         else:
             st.info("ファイルを選択してデータを抽出してください")
     
+    with tab2:
+        render_data_tab()
+    
     # タブ3: 検証結果
     with tab3:
         st.header("データ検証結果")
@@ -513,20 +766,20 @@ def main():
             
             if result['invalid_records']:
                 st.subheader("⚠️ 無効なレコード")
-                for invalid in result['invalid_records']:
-                    record = invalid['record']
-                    day = record.get('day', 'N/A')
-                    weekday = record.get('weekday', '')
-                    date_str = build_date_from_components(record) if record.get('day') else 'N/A'
-                    with st.expander(f"レコード {invalid['index']} - 日={day}, 曜={weekday or '？'}, 日付={date_str}"):
-                        st.json(invalid['record'])
-                        st.error("エラー:")
-                        for error in invalid['errors']:
-                            st.error(f"  - {error}")
+                # レコードごとにst.jsonを呼ぶと描画コストが大きいため、1つのJSONにまとめて表示する
+                st.json([
+                    {
+                        'index': invalid['index'],
+                        'date': build_date_from_components(invalid['record']) if invalid['record'].get('day') else 'N/A',
+                        'record': invalid['record'],
+                        'errors': invalid['errors'],
+                    }
+                    for invalid in result['invalid_records']
+                ])
             
             if result['valid_records']:
                 st.subheader("✅ 有効なレコード")
-                valid_df = pd.DataFrame(result['valid_records'])
+                valid_df = build_records_dataframe(result['valid_records'])
                 st.dataframe(valid_df, width='stretch')
         else:
             if st.session_state.extracted_data:
@@ -565,19 +818,24 @@ def main():
                 status_text = st.empty()
                 log_area = st.empty()
                 
-                logs = []
+                # 画面には直近のログだけを表示する（毎回全文を送り直さないため）
+                all_logs = []
+                recent_logs = collections.deque(maxlen=200)
                 
                 def log_callback(message):
-                    logs.append(message)
-                    log_area.text_area("実行ログ", "\n".join(logs), height=300)
+                    all_logs.append(message)
+                    recent_logs.append(message)
+                    log_area.code("\n".join(recent_logs))
                 
                 try:
                     # ログインリトライ設定を取得（configが読み込まれている場合）
                     login_retry_count = 3
                     login_retry_interval = 5
+                    debugger_address = None
                     if config and 'recoru' in config:
                         login_retry_count = config['recoru'].get('login_retry_count', 3)
                         login_retry_interval = config['recoru'].get('login_retry_interval', 5)
+                        debugger_address = config['recoru'].get('debugger_address')
                     
                     client = RecoruClient(
                         contract_id=contract_id,
@@ -587,7 +845,9 @@ def main():
                         base_url=base_url,
                         profile_path=profile_path if profile_path else None,
                         login_retry_count=login_retry_count,
-                        login_retry_interval=login_retry_interval
+                        login_retry_interval=login_retry_interval,
+                        chrome_args=HEADLESS_CHROME_ARGS if headless_mode else None,
+                        debugger_address=debugger_address
                     )
                     
                     # ログイン
@@ -608,15 +868,16 @@ def main():
                     logger.info(f"勤怠データ入力開始: {len(valid_records)}件のレコード")
                     results = {'success': [], 'failed': []}
                     
-                    for i, record in enumerate(valid_records):
+                    # ブラウザ操作はワーカースレッドで行い、こちらは結果を受け取って進捗を更新する
+                    for i, record, succeeded in input_records_in_background(client, valid_records):
                         progress = (i + 1) / len(valid_records)
                         progress_bar.progress(progress)
                         
                         date = record.get('date', 'N/A')
-                        status_text.text(f"入力中: {date} ({i+1}/{len(valid_records)})")
-                        logger.info(f"レコード {i+1}/{len(valid_records)} を入力中: {date}")
+                        status_text.text(f"入力済み: {date} ({i+1}/{len(valid_records)})")
+                        logger.info(f"レコード {i+1}/{len(valid_records)} を入力: {date}")
                         
-                        if client.input_attendance(record):
+                        if succeeded:
                             results['success'].append(date)
                             logger.info(f"✅ {date}: 入力成功")
                             log_callback(f"✅ {date}: 入力成功")
@@ -644,6 +905,14 @@ def main():
                             day = failed.get('day', 'N/A')
                             st.write(f"- 日={day}, 日付={date_str}")
                     
+                    if all_logs:
+                        st.download_button(
+                            "実行ログをダウンロード",
+                            "\n".join(all_logs),
+                            file_name="recoru_input_log.txt",
+                            mime="text/plain"
+                        )
+                    
                     # ブラウザを閉じずに保持
                     st.session_state['recoru_client'] = client
                 
@@ -5,55 +5,77 @@ import argparse
 import sys
 import os
 import logging
+import logging.handlers
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
-from src.ocr_extractor import OCRExtractor
-from src.excel_extractor import ExcelExtractor
-from src.data_validator import DataValidator
-from src.recoru_client import RecoruClient
+from typing import List, Optional
 from src.utils import load_config
+# 抽出・入力用のモジュール（easyocr / selenium など重い依存を含む）は、
+# 使う処理の中でインポートする（--helpやExcelのみの実行で読み込まないため）
 
 # ログ設定
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# ファイルへの書き込みはMemoryHandlerでまとめて行う（レコードごとに書き込まない。ERROR以上は即時書き込み）
+# MemoryHandlerは書式化を転送先に任せるため、FileHandler側にフォーマッターを設定する
+file_handler = logging.FileHandler('logs/app.log', encoding='utf-8')
+file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+file_log_handler = logging.handlers.MemoryHandler(
+    capacity=512,
+    flushLevel=logging.ERROR,
+    target=file_handler
+)
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    format=LOG_FORMAT,
     handlers=[
-        logging.FileHandler('logs/app.log', encoding='utf-8'),
+        file_log_handler,
         logging.StreamHandler(sys.stdout)
     ]
 )
 logger = logging.getLogger(__name__)
 
+# 対応する拡張子
+IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.gif', '.bmp'})
+PDF_EXTENSIONS = frozenset({'.pdf'})
+EXCEL_EXTENSIONS = frozenset({'.xlsx', '.xls'})
+
 
 def ensure_logs_directory():
     """logsディレクトリが存在しない場合は作成"""
     os.makedirs('logs', exist_ok=True)
 
 
-def extract_from_file(file_path: str, poppler_path: Optional[str] = None) -> list:
+def extract_from_file(file_path: str, poppler_path: Optional[str] = None, pdf_dpi: int = 150, page_cache_dir: Optional[str] = None) -> list:
     """
     ファイルから勤怠データを抽出
     
     Args:
         file_path: ファイルパス
+        poppler_path: Popplerのbinディレクトリパス
+        pdf_dpi: PDFを画像に変換する際の解像度
+        page_cache_dir: Popplerで変換したPDFのページ画像のキャッシュ先（Noneの場合はキャッシュしない）
     
     Returns:
         勤怠データのリスト
     """
     file_ext = Path(file_path).suffix.lower()
     
-    if file_ext in ['.jpg', '.jpeg', '.png', '.gif', '.bmp']:
+    if file_ext in IMAGE_EXTENSIONS:
         logger.info(f"画像ファイルからデータを抽出中: {file_path}")
+        from src.ocr_extractor import OCRExtractor
         extractor = OCRExtractor(use_easyocr=True)
         return extractor.extract_from_image(file_path)
     
-    elif file_ext == '.pdf':
+    elif file_ext in PDF_EXTENSIONS:
         logger.info(f"PDFファイルからデータを抽出中: {file_path}")
-        extractor = OCRExtractor(use_easyocr=True, poppler_path=poppler_path)
+        from src.ocr_extractor import OCRExtractor
+        extractor = OCRExtractor(use_easyocr=True, poppler_path=poppler_path, pdf_dpi=pdf_dpi, page_cache_dir=page_cache_dir)
         return extractor.extract_from_pdf(file_path)
     
-    elif file_ext in ['.xlsx', '.xls']:
+    elif file_ext in EXCEL_EXTENSIONS:
         logger.info(f"Excelファイルからデータを抽出中: {file_path}")
+        from src.excel_extractor import ExcelExtractor
         extractor = ExcelExtractor()
         return extractor.extract_from_excel(file_path)
     
@@ -61,17 +83,62 @@ def extract_from_file(file_path: str, poppler_path: Optional[str] = None) -> lis
         raise ValueError(f"サポートされていないファイル形式です: {file_ext}")
 
 
-def main():
-    """メイン処理"""
+def extract_from_files(file_paths: List[str], poppler_path: Optional[str] = None, pdf_dpi: int = 150, page_cache_dir: Optional[str] = None) -> list:
+    """
+    複数のファイルから勤怠データを抽出（指定順に結合）
+    
+    Excelファイルが複数ある場合はスレッドで並列に読み込む（ログのMemoryHandlerを子プロセスに引き継がないよう、プロセスは分けない）。
+    画像・PDFはOCRモデルを1つだけ使うよう、順に処理する。
+    
+    Args:
+        file_paths: ファイルパスのリスト
+        poppler_path: Popplerのbinディレクトリパス
+        pdf_dpi: PDFを画像に変換する際の解像度
+        page_cache_dir: Popplerで変換したPDFのページ画像のキャッシュ先（Noneの場合はキャッシュしない）
+    
+    Returns:
+        勤怠データのリスト
+    """
+    excel_paths = list(dict.fromkeys(
+        path for path in file_paths if Path(path).suffix.lower() in EXCEL_EXTENSIONS
+    ))
+    excel_results = {}
+    max_workers = min(len(excel_paths), os.cpu_count() or 1)
+    if max_workers > 1:
+        logger.info(f"{len(excel_paths)}件のExcelファイルを並列で読み込みます（スレッド数: {max_workers}）")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            excel_results = dict(zip(excel_paths, executor.map(extract_from_file, excel_paths)))
+    
+    records = []
+    for path in file_paths:
+        if path in excel_results:
+            records.extend(excel_results[path])
+        else:
+            records.extend(extract_from_file(path, poppler_path=poppler_path, pdf_dpi=pdf_dpi, page_cache_dir=page_cache_dir))
+    return records
+
+
+@lru_cache(maxsize=1)
+def build_parser() -> argparse.ArgumentParser:
+    """
+    コマンドライン引数のパーサーを作成（2回目以降は作成済みのものを使う）
+    
+    Returns:
+        引数パーサー
+    """
     parser = argparse.ArgumentParser(description='勤怠記録自動入力アプリ')
-    parser.add_argument('--file', '-f', required=True, help='入力ファイル（画像またはExcel）')
+    parser.add_argument('--file', '-f', required=True, nargs='+', help='入力ファイル（画像またはExcel、複数指定可）')
     parser.add_argument('--config', '-c', default='config.json', help='設定ファイルのパス（デフォルト: config.json）')
     parser.add_argument('--validate-only', action='store_true', help='検証のみ実行（入力は行わない）')
     parser.add_argument('--headless', action='store_true', help='ヘッドレスモードで実行')
     parser.add_argument('--url', '-u', type=str, help='Recoruの勤怠入力ページURL（例: https://app.recoru.in/ap/menuAttendance/?ui=362&pp=1）')
     parser.add_argument('--profile', '-p', type=str, help='Chromeのプロファイルパス（例: C:\\Users\\username\\AppData\\Local\\Google\\Chrome\\User Data）')
-    
-    args = parser.parse_args()
+    return parser
+
+
+def main():
+    """メイン処理"""
+    args = build_parser().parse_args()
     
     ensure_logs_directory()
     
@@ -82,6 +149,12 @@ def main():
         recoru_config = config.get('recoru', {})
         ocr_config = config.get('ocr', {})
         poppler_path = ocr_config.get('poppler_path') or os.environ.get("POPPLER_PATH")
+        pdf_dpi = int(ocr_config.get('dpi', 150) or 150)
+        # PopplerでのPDFのページ画像の変換結果をキャッシュするか（同じPDFを繰り返し読み込む場合のみ有効にする）
+        page_cache_dir = None
+        if ocr_config.get('page_cache'):
+            from src.ocr_extractor import PDF_PAGE_CACHE_DIR
+            page_cache_dir = PDF_PAGE_CACHE_DIR
         
         # URLの優先順位: コマンドライン引数 > config.json
         base_url = args.url or recoru_config.get('base_url')
@@ -90,6 +163,8 @@ def main():
         # ログインリトライ設定
         login_retry_count = recoru_config.get('login_retry_count', 3)
         login_retry_interval = recoru_config.get('login_retry_interval', 5)
+        # 起動済みのChromeに接続する場合のリモートデバッグのアドレス
+        debugger_address = recoru_config.get('debugger_address')
         
         if not args.validate_only:
             if not all([recoru_config.get('contract_id'), recoru_config.get('login_id'), recoru_config.get('password')]):
@@ -102,7 +177,7 @@ def main():
         logger.info("=" * 50)
         
         # PDFの場合はPopplerが必要。PATHに通していない場合は poppler_path を指定する。
-        records = extract_from_file(args.file, poppler_path=str(poppler_path) if poppler_path else None)
+        records = extract_from_files(args.file, poppler_path=str(poppler_path) if poppler_path else None, pdf_dpi=pdf_dpi, page_cache_dir=page_cache_dir)
         logger.info(f"抽出されたレコード数: {len(records)}")
         
         # 抽出したレコードの詳細をログと標準出力に表示
@@ -115,7 +190,9 @@ def main():
                 start = record.get('start_time', 'なし')
                 end = record.get('end_time', 'なし')
                 status = record.get('status', 'unknown')
-                logger.info(f"レコード {idx:3d}: 日={day:2d}, 出勤={start:>5s}, 退勤={end:>5s}, 状態={status}")
+                # 書式化はログ出力時に行う（ログレベルで抑制されている場合は書式化しない）
+                # 日が取得できなかったレコード（None）も出力できるよう、日は%sで表示する
+                logger.info("レコード %3d: 日=%2s, 出勤=%5s, 退勤=%5s, 状態=%s", idx, day, start, end, status)
             logger.info("=" * 60)
         
         if not records:
@@ -127,6 +204,7 @@ def main():
         logger.info("データ検証を開始します")
         logger.info("=" * 50)
         
+        from src.data_validator import DataValidator
         validator = DataValidator()
         validation_result = validator.validate_records(records)
         
@@ -138,7 +216,7 @@ def main():
         if validation_result['invalid_records']:
             logger.warning("無効なレコード:")
             for invalid in validation_result['invalid_records']:
-                logger.warning(f"  インデックス {invalid['index']}: {invalid['errors']}")
+                logger.warning("  インデックス %s: %s", invalid['index'], invalid['errors'])
         
         if not validation_result['valid_records']:
             logger.error("有効なレコードがありません")
@@ -154,6 +232,7 @@ def main():
         logger.info("レコルへの自動入力を開始します")
         logger.info("=" * 50)
         
+        from src.recoru_client import RecoruClient, HEADLESS_CHROME_ARGS
         client = RecoruClient(
             contract_id=recoru_config['contract_id'],
             login_id=recoru_config['login_id'],
@@ -162,7 +241,9 @@ def main():
             base_url=base_url,
             profile_path=profile_path,
             login_retry_count=login_retry_count,
-            login_retry_interval=login_retry_interval
+            login_retry_interval=login_retry_interval,
+            chrome_args=HEADLESS_CHROME_ARGS if args.headless else None,
+            debugger_address=debugger_address
         )
         
         try:
@@ -185,7 +266,7 @@ def main():
             if results['failed']:
                 logger.warning("失敗したレコード:")
                 for failed in results['failed']:
-                    logger.warning(f"  日付: {failed['date']}")
+                    logger.warning("  日付: %s", failed['date'])
             
             logger.info("処理が完了しました。ブラウザは開いたままです。手動で確認してください。")
         
@@ -206,6 +287,9 @@ def main():
     except Exception as e:
         logger.error(f"エラーが発生しました: {e}", exc_info=True)
         sys.exit(1)
+    finally:
+        # バッファに残っているログをファイルに書き出す
+        file_log_handler.flush()
 
 
 if __name__ == '__main__':
@@ -3,7 +3,25 @@
 """
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime
-from .utils import calculate_work_hours, build_date_from_components
+from functools import lru_cache
+from .utils import build_date_from_components, time_to_minutes
+
+# 日付（日）として有効な値
+_VALID_DAYS = frozenset(range(1, 32))
+
+
+@lru_cache(maxsize=1024)
+def _parse_ymd(date_str: str) -> datetime:
+    """
+    YYYY-MM-DD形式の日付をパース（同じ日付文字列は結果を使い回す）
+    
+    Args:
+        date_str: 日付文字列
+    
+    Returns:
+        パースした日時
+    """
+    return datetime.strptime(date_str, '%Y-%m-%d')
 
 
 class DataValidator:
@@ -13,90 +31,67 @@ class DataValidator:
         """初期化"""
         pass
     
-    def validate_record(self, record: Dict[str, Optional[str]]) -> Tuple[bool, List[str]]:
+    def validate_record(self, record: Dict[str, Optional[str]], now: Optional[datetime] = None) -> Tuple[bool, List[str]]:
         """
         1件のレコードを検証
         
         Args:
             record: 勤怠レコード（day, start_time, end_time, statusを含む）
+            now: 年・月のないレコードの日付に使う現在日時（Noneの場合はその都度取得）
         
         Returns:
             (検証結果, エラーメッセージのリスト)
         """
         errors = []
+        # 何度も参照する項目は最初に取り出しておく
+        day_value = record.get('day')
+        start_time = record.get('start_time')
+        end_time = record.get('end_time')
         
         # 必須項目のチェック（dayは必須）
-        if record.get('day') is None:
+        if day_value is None:
             errors.append("日付（日）が設定されていません")
         else:
             try:
-                day = int(record['day'])
-                if not (1 <= day <= 31):
+                # 既にintの場合は変換しない
+                day = day_value if type(day_value) is int else int(day_value)
+                if day not in _VALID_DAYS:
                     errors.append(f"日付（日）が範囲外です: {day}")
             except (ValueError, TypeError):
-                errors.append(f"日付（日）の形式が不正です: {record.get('day')}")
+                errors.append(f"日付（日）の形式が不正です: {day_value}")
         
         # 日付文字列を構築（検証用）
-        date_str = build_date_from_components(record)
+        date_str = build_date_from_components(record, now)
         if date_str:
             try:
-                datetime.strptime(date_str, '%Y-%m-%d')
+                _parse_ymd(date_str)
             except ValueError:
                 errors.append(f"日付の形式が不正です: {date_str}")
         
         # 出勤時刻のチェック（オプション、status='off'の場合は不要）
-        if record.get('start_time'):
+        # 時刻は1回だけパースし、以降の論理チェック・勤務時間計算で使い回す
+        start = None
+        if start_time:
             try:
-                datetime.strptime(record['start_time'], '%H:%M')
+                start = time_to_minutes(start_time)
             except ValueError:
-                errors.append(f"出勤時刻の形式が不正です: {record['start_time']}")
-        elif record.get('status') != 'off':
-            # statusが'off'でない場合は出勤時刻が推奨されるが、必須ではない
-            pass
+                errors.append(f"出勤時刻の形式が不正です: {start_time}")
         
         # 退勤時刻のチェック（オプション、status='off'の場合は不要）
-        if record.get('end_time'):
+        end = None
+        if end_time:
             try:
-                datetime.strptime(record['end_time'], '%H:%M')
+                end = time_to_minutes(end_time)
             except ValueError:
-                errors.append(f"退勤時刻の形式が不正です: {record['end_time']}")
-        elif record.get('status') != 'off':
-            # statusが'off'でない場合は退勤時刻が推奨されるが、必須ではない
-            pass
-        
-        # 時刻の論理チェック
-        if record.get('start_time') and record.get('end_time'):
-            start = datetime.strptime(record['start_time'], '%H:%M')
-            end = datetime.strptime(record['end_time'], '%H:%M')
-            
-            # 日をまたぐ場合を考慮
-            if end < start:
-                # 翌日として扱う
-                end = end.replace(day=end.day + 1 if end.day < 28 else 1)
-            
-            work_minutes = (end - start).total_seconds() / 60
-            
-            # 勤務時間が負の値になる場合
-            if work_minutes < 0:
-                errors.append("退勤時刻が出勤時刻より前です")
-            
-            # 異常に長い勤務時間（24時間超）の警告
-            if work_minutes > 24 * 60:
-                errors.append(f"勤務時間が24時間を超えています: {work_minutes/60:.1f}時間")
-        
-        # 勤務時間の計算とチェック（start_timeとend_timeが両方ある場合のみ）
-        if record.get('start_time') and record.get('end_time'):
-            work_hours = calculate_work_hours(
-                record['start_time'],
-                record['end_time'],
-                '00:00'  # break_timeは不要になったので常に00:00
-            )
-            
-            if work_hours is not None:
-                if work_hours < 0:
-                    errors.append("退勤時刻が出勤時刻より前です")
-                elif work_hours > 16:
-                    errors.append(f"勤務時間が異常に長いです: {work_hours:.1f}時間")
+                errors.append(f"退勤時刻の形式が不正です: {end_time}")
+        
+        # 時刻の論理チェック・勤務時間のチェック（start_timeとend_timeが両方正しい場合のみ）
+        if start is not None and end is not None:
+            # 勤務時間（分）を整数で計算し、日をまたぐ場合は翌日として扱う（calculate_work_hoursと同じ扱い）
+            # break_timeは不要になったので休憩は差し引かない
+            work_minutes = (end - start) % (24 * 60)
+            if work_minutes > 16 * 60:
+                errors.append(f"勤務時間が異常に長いです: {work_minutes / 60:.1f}時間")
         
         return len(errors) == 0, errors
     
@@ -112,9 +107,13 @@ class DataValidator:
         """
         valid_records = []
         invalid_records = []
+        # 1か月分程度の件数ではDataFrame化するより1件ずつ検証する方が速いため、ループのまま処理する
+        validate_record = self.validate_record
+        # 現在日時は1回だけ取得し、全レコードで同じ年月を使う
+        now = datetime.now()
         
         for idx, record in enumerate(records):
-            is_valid, errors = self.validate_record(record)
+            is_valid, errors = validate_record(record, now)
             
             if is_valid:
                 valid_records.append(record)
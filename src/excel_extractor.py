@@ -1,11 +1,75 @@
 """
 Excelファイルからの勤怠データ抽出
 """
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union, IO, Tuple
 import re
+from functools import lru_cache
 from .utils import normalize_date, normalize_time
 
+# python-calamine（Rust実装）がインストールされていれば高速なcalamineエンジンで読み込む
+# 未インストール時のopenpyxlエンジンも、pandas側でread_only=True, data_only=Trueで開かれる
+# （.xlsも扱うため、openpyxlを直接使わずpd.read_excel経由で読み込む）
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE: Optional[str] = "calamine"
+except ImportError:
+    EXCEL_ENGINE = None
+
+# 列名のパターン（キーごとに1つの正規表現にまとめてモジュール読み込み時にコンパイル）
+COLUMN_PATTERNS = {
+    'date': re.compile(r'日付|date|年月日|日', re.IGNORECASE),
+    'start_time': re.compile(r'出勤|開始|start|出社|始業', re.IGNORECASE),
+    'end_time': re.compile(r'退勤|終了|end|退社|終業', re.IGNORECASE),
+    'break_time': re.compile(r'休憩|break|休み', re.IGNORECASE),
+}
+
+
+@lru_cache(maxsize=64)
+def _detect_columns_cached(column_names: Tuple[str, ...]) -> Tuple[Optional[int], ...]:
+    """
+    列名のタプルから勤怠関連の列番号を検出（同じ見出し行のテンプレートは結果を使い回す）
+    
+    Args:
+        column_names: 小文字化した列名のタプル
+    
+    Returns:
+        COLUMN_PATTERNSのキー順の列番号のタプル（見つからない項目はNone）
+    """
+    column_mapping = dict.fromkeys(COLUMN_PATTERNS)
+    
+    for col_idx, col_name_str in enumerate(column_names):
+        # 1つの列は最初にマッチした項目にだけ割り当てる
+        for key, pattern in COLUMN_PATTERNS.items():
+            if column_mapping[key] is None and pattern.search(col_name_str):
+                column_mapping[key] = col_idx
+                break
+    
+    return tuple(column_mapping.values())
+
+
+def _map_unique(column: pd.Series, cell_converter) -> pd.Series:
+    """
+    列の値ごとに変換関数を適用（同じ値は1回だけ変換する。Series.map(..., na_action='ignore')と同じ結果）
+    
+    Args:
+        column: 変換する列（object型）
+        cell_converter: セルごとの変換関数
+    
+    Returns:
+        変換後の列（欠損値のセルは元の値のまま）
+    """
+    # 勤怠表の列は同じ値（同じ時刻・同じ書式の日付）が繰り返し現れるため、重複を除いてから変換する
+    codes, uniques = pd.factorize(column, use_na_sentinel=True)
+    converted = np.empty(len(uniques), dtype=object)
+    converted[:] = [cell_converter(value) for value in uniques]
+    values = column.to_numpy(dtype=object)
+    present = codes >= 0
+    result = values.copy()
+    result[present] = converted[codes[present]]
+    return pd.Series(result, index=column.index, dtype=object)
+
 
 class ExcelExtractor:
     """Excelファイルから勤怠データを抽出"""
@@ -24,52 +88,117 @@ class ExcelExtractor:
         Returns:
             列名のマッピング（date, start_time, end_time, break_time）
         """
-        column_mapping = {
-            'date': None,
-            'start_time': None,
-            'end_time': None,
-            'break_time': None
-        }
-        
-        # 列名のパターン
-        patterns = {
-            'date': [r'日付', r'date', r'年月日', r'日'],
-            'start_time': [r'出勤', r'開始', r'start', r'出社', r'始業'],
-            'end_time': [r'退勤', r'終了', r'end', r'退社', r'終業'],
-            'break_time': [r'休憩', r'break', r'休み']
-        }
-        
-        for col_idx, col_name in enumerate(df.columns):
-            col_name_str = str(col_name).lower()
-            
-            for key, pattern_list in patterns.items():
-                if column_mapping[key] is None:
-                    for pattern in pattern_list:
-                        if re.search(pattern, col_name_str, re.IGNORECASE):
-                            column_mapping[key] = col_idx
-                            break
-                    if column_mapping[key] is not None:
-                        break
-        
-        return column_mapping
+        # 呼び出し側で書き換えられるため、キャッシュ結果から毎回新しい辞書を作って返す
+        column_names = tuple(str(col_name).lower() for col_name in df.columns)
+        return dict(zip(COLUMN_PATTERNS, _detect_columns_cached(column_names)))
+    
+    @staticmethod
+    def _date_cell_to_str(value) -> Optional[str]:
+        """
+        日付のセル値をYYYY-MM-DD形式に変換
+        
+        Args:
+            value: セルの値
+        
+        Returns:
+            日付文字列、変換できない場合はNone
+        """
+        # pandasの日付型の場合
+        if isinstance(value, pd.Timestamp):
+            return value.strftime('%Y-%m-%d')
+        return normalize_date(str(value))
+    
+    @staticmethod
+    def _time_cell_to_str(value) -> Optional[str]:
+        """
+        時刻のセル値をHH:MM形式に変換
+        
+        Args:
+            value: セルの値
+        
+        Returns:
+            時刻文字列、変換できない場合はNone
+        """
+        if isinstance(value, pd.Timestamp):
+            return value.strftime('%H:%M')
+        return normalize_time(str(value))
     
-    def extract_from_excel(self, excel_path: str, sheet_name: Optional[str] = None) -> List[Dict[str, Optional[str]]]:
+    @staticmethod
+    def _break_cell_to_str(value) -> Optional[str]:
+        """
+        休憩時間のセル値をHH:MM形式に変換
+        
+        Args:
+            value: セルの値
+        
+        Returns:
+            休憩時間の文字列、変換できない場合はNone
+        """
+        if isinstance(value, pd.Timedelta):
+            hours = int(value.total_seconds() // 3600)
+            minutes = int((value.total_seconds() % 3600) // 60)
+            return f"{hours:02d}:{minutes:02d}"
+        return normalize_time(str(value))
+    
+    def _convert_column(self, df: pd.DataFrame, col_idx: Optional[int], cell_converter, datetime_format: str) -> pd.Series:
+        """
+        列全体を文字列に変換（日時型の列はまとめてstrftime、それ以外はセルごとに変換）
+        
+        Args:
+            df: pandas DataFrame
+            col_idx: 対象の列番号（Noneの場合は全行None）
+            cell_converter: セルごとの変換関数
+            datetime_format: 日時型の列に使うフォーマット
+        
+        Returns:
+            変換後の列（変換できないセルは欠損値）
+        """
+        if col_idx is None:
+            return pd.Series(None, index=df.index, dtype=object)
+        column = df.iloc[:, col_idx]
+        if pd.api.types.is_datetime64_any_dtype(column):
+            return column.dt.strftime(datetime_format).astype(object)
+        return _map_unique(column.astype(object), cell_converter)
+    
+    def _convert_break_column(self, df: pd.DataFrame, col_idx: Optional[int]) -> pd.Series:
+        """
+        休憩時間の列全体をHH:MM形式に変換（時間差型の列はまとめて計算）
+        
+        Args:
+            df: pandas DataFrame
+            col_idx: 休憩時間の列番号（Noneの場合は全行None）
+        
+        Returns:
+            変換後の列（変換できないセルは欠損値）
+        """
+        if col_idx is None:
+            return pd.Series(None, index=df.index, dtype=object)
+        column = df.iloc[:, col_idx]
+        if pd.api.types.is_timedelta64_dtype(column):
+            seconds = column.dt.total_seconds()
+            hours = (seconds // 3600).astype('Int64').astype(str).str.zfill(2)
+            minutes = ((seconds % 3600) // 60).astype('Int64').astype(str).str.zfill(2)
+            return (hours + ':' + minutes).where(column.notna()).astype(object)
+        return _map_unique(column.astype(object), self._break_cell_to_str)
+    
+    def extract_from_excel(self, excel_path: Union[str, IO[bytes]], sheet_name: Optional[str] = None, return_df: bool = False) -> Union[List[Dict[str, Optional[str]]], Tuple[List[Dict[str, Optional[str]]], pd.DataFrame]]:
         """
         Excelファイルから勤怠データを抽出
         
         Args:
-            excel_path: Excelファイルのパス
+            excel_path: Excelファイルのパス、またはファイルオブジェクト（BytesIOなど）
             sheet_name: シート名（Noneの場合は最初のシート）
+            return_df: 読み込んだDataFrameも返すか（デバッグ表示で再読み込みしないため）
         
         Returns:
-            勤怠データのリスト
+            勤怠データのリスト（return_df=Trueの場合は(勤怠データのリスト, DataFrame)のタプル）
         """
         try:
             # Excelファイルを読み込む
             if sheet_name:
-                df = pd.read_excel(excel_path, sheet_name=sheet_name)
+                df = pd.read_excel(excel_path, sheet_name=sheet_name, engine=EXCEL_ENGINE)
             else:
-                df = pd.read_excel(excel_path)
+                df = pd.read_excel(excel_path, engine=EXCEL_ENGINE)
         except Exception as e:
             raise ValueError(f"Excelファイルの読み込みに失敗しました: {e}")
         
@@ -77,8 +206,9 @@ class ExcelExtractor:
         column_mapping = self.detect_columns(df)
         
         # 列が見つからない場合のデフォルト（最初の数列を使用）
+        # （列が1つもないシートでは既定の列を使わず、空の結果を返す）
         if column_mapping['date'] is None:
-            column_mapping['date'] = 0
+            column_mapping['date'] = 0 if len(df.columns) > 0 else None
         if column_mapping['start_time'] is None:
             column_mapping['start_time'] = 1 if len(df.columns) > 1 else None
         if column_mapping['end_time'] is None:
@@ -86,55 +216,23 @@ class ExcelExtractor:
         if column_mapping['break_time'] is None:
             column_mapping['break_time'] = 3 if len(df.columns) > 3 else None
         
-        attendance_records = []
-        
-        for idx, row in df.iterrows():
-            record = {}
-            
-            # 日付の抽出と正規化
-            if column_mapping['date'] is not None:
-                date_value = row.iloc[column_mapping['date']]
-                if pd.notna(date_value):
-                    # pandasの日付型の場合
-                    if isinstance(date_value, pd.Timestamp):
-                        record['date'] = date_value.strftime('%Y-%m-%d')
-                    else:
-                        record['date'] = normalize_date(str(date_value))
-            
-            # 出勤時刻の抽出と正規化
-            if column_mapping['start_time'] is not None:
-                start_value = row.iloc[column_mapping['start_time']]
-                if pd.notna(start_value):
-                    if isinstance(start_value, pd.Timestamp):
-                        record['start_time'] = start_value.strftime('%H:%M')
-                    else:
-                        record['start_time'] = normalize_time(str(start_value))
-            
-            # 退勤時刻の抽出と正規化
-            if column_mapping['end_time'] is not None:
-                end_value = row.iloc[column_mapping['end_time']]
-                if pd.notna(end_value):
-                    if isinstance(end_value, pd.Timestamp):
-                        record['end_time'] = end_value.strftime('%H:%M')
-                    else:
-                        record['end_time'] = normalize_time(str(end_value))
-            
-            # 休憩時間の抽出と正規化
-            if column_mapping['break_time'] is not None:
-                break_value = row.iloc[column_mapping['break_time']]
-                if pd.notna(break_value):
-                    if isinstance(break_value, pd.Timedelta):
-                        hours = int(break_value.total_seconds() // 3600)
-                        minutes = int((break_value.total_seconds() % 3600) // 60)
-                        record['break_time'] = f"{hours:02d}:{minutes:02d}"
-                    else:
-                        record['break_time'] = normalize_time(str(break_value))
-            
-            # 必須項目が揃っている場合のみ追加
-            if record.get('date') and record.get('start_time') and record.get('end_time'):
-                if not record.get('break_time'):
-                    record['break_time'] = "00:00"
-                attendance_records.append(record)
+        # 列ごとにまとめて変換する（日時型の列はpandasで一括変換し、それ以外はセルごとに正規化）
+        records_df = pd.DataFrame({
+            'date': self._convert_column(df, column_mapping['date'], self._date_cell_to_str, '%Y-%m-%d'),
+            'start_time': self._convert_column(df, column_mapping['start_time'], self._time_cell_to_str, '%H:%M'),
+            'end_time': self._convert_column(df, column_mapping['end_time'], self._time_cell_to_str, '%H:%M'),
+            'break_time': self._convert_break_column(df, column_mapping['break_time']),
+        })
+        
+        # 必須項目（日付・出勤・退勤）が揃っている行のみ残し、休憩がない場合は00:00とする
+        records_df['break_time'] = records_df['break_time'].where(
+            records_df['break_time'].notna() & records_df['break_time'].ne(''), "00:00"
+        )
+        required = records_df[['date', 'start_time', 'end_time']]
+        records_df = records_df[(required.notna() & required.ne('')).all(axis=1)]
+        attendance_records = records_df.astype(object).to_dict('records')
         
+        if return_df:
+            return attendance_records, df
         return attendance_records
 
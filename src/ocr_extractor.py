@@ -2,36 +2,148 @@
 OCRを使用した画像からの勤怠データ抽出
 """
 import os
+import hashlib
+import logging
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import cv2
 import numpy as np
 from PIL import Image
-import pytesseract
-import easyocr
 from typing import List, Dict, Optional, Tuple, Union
 import re
 from datetime import datetime
 from .utils import normalize_time
+# easyocr（torchを読み込むため重い）とpytesseractは、使う処理の中でインポートする
+# （Tesseractのみ・Excelのみの利用時に読み込まないため）
+
+try:
+    from pdf2image import convert_from_path
+except ImportError:
+    convert_from_path = None
+
+# PyMuPDFがインストールされていれば、Popplerを使わずにプロセス内でPDFを画像に変換する
+try:
+    import pymupdf
+except ImportError:
+    pymupdf = None
+
+
+# 勤怠データのパースに使う正規表現（トークンごとに何度も使うため、モジュール読み込み時にコンパイル）
+TIME_PREFIX_PATTERN = re.compile(r"^\d{1,2}[\.:]\d{2}")  # 先頭が時刻（HH.MM や HH:MM）
+DAY_NUMBER_PATTERN = re.compile(r"(\d{1,2})")  # 日付の数字
+TIME_PATTERN = re.compile(r"(\d{1,2}[\.:]\d{2})")  # 時刻（トークン内の任意の位置）
+
+# 曜日の文字
+WEEKDAY_CHARS = frozenset("月火水木金土日")
+
+# 傾き検出に使う画像の長辺の最大サイズ（これより大きい画像は縮小して検出する）
+SKEW_DETECTION_MAX_SIZE = 1000
+
+# 最も多い2つの輝度値（背景色と文字色）が画素全体に占める割合がこれ以上の画像は、
+# スクリーンショットなどのノイズのない画像とみなし、ノイズ除去・コントラスト調整を省略する
+# （スキャン画像はノイズで輝度値がばらつくため、0.5程度にとどまる）
+CLEAN_IMAGE_DOMINANT_RATIO = 0.9
+
+# PopplerでPDFをページ画像に変換した結果のキャッシュの既定の保存先（同じPDFを読み直す際に変換を省略する）
+# キャッシュは任意で、OCRExtractorにpage_cache_dirを指定した場合のみ使う
+PDF_PAGE_CACHE_DIR = os.path.join('cache', 'pdf_pages')
+PDF_PAGE_CACHE_MAX_ENTRIES = 16
+
+logger = logging.getLogger(__name__)
+
+# EasyOCRのReader作成を直列化するロック（同時に初回作成されてモデルを二重に読み込まないため）
+_reader_lock = threading.Lock()
+
+
+@lru_cache(maxsize=4)
+def _create_easyocr_reader(languages: Tuple[str, ...], gpu: bool) -> "easyocr.Reader":
+    """
+    EasyOCRのReaderを作成してウォームアップする（同じ言語・GPU設定では1回だけ作成）
+
+    Args:
+        languages: 認識する言語のタプル
+        gpu: GPUを使用するか
+
+    Returns:
+        EasyOCRのReader
+    """
+    # CPUでは認識モデルをINT8に量子化（quantize、EasyOCRの既定値）し、
+    # GPUではcuDNNに入力サイズごとの最速アルゴリズムを選ばせる
+    import easyocr
+    reader = easyocr.Reader(list(languages), gpu=gpu, quantize=True, cudnn_benchmark=gpu)
+    # 初回推論時の遅延を先に済ませておく
+    reader.readtext(np.zeros((32, 32, 3), dtype=np.uint8))
+    return reader
+
+
+def resolve_ocr_device(device: Optional[str] = None) -> bool:
+    """
+    OCRの実行デバイスを決定してGPUを使用するかを返す
+
+    Args:
+        device: "cpu"・"cuda"・"auto"のいずれか（Noneの場合は環境変数OCR_DEVICE、未設定なら"auto"）
+
+    Returns:
+        GPUを使用するか（"auto"の場合はCUDAが使えればTrue）
+    """
+    device = (device or os.environ.get("OCR_DEVICE") or "auto").lower()
+    if device not in ("cpu", "cuda", "auto"):
+        raise ValueError(f"OCRのデバイス指定が不正です（cpu, cuda, auto のいずれか）: {device}")
+    if device != "auto":
+        return device == "cuda"
+    try:
+        # torchはEasyOCRの依存パッケージ（EasyOCRを使う場合のみ必要なため、ここで読み込む）
+        import torch
+        return torch.cuda.is_available()
+    except ImportError:
+        return False
+
+
+def get_easyocr_reader(languages: Tuple[str, ...] = ('ja', 'en'), device: Optional[str] = None) -> "easyocr.Reader":
+    """
+    プロセス内で共有するEasyOCRのReaderを取得
+
+    Args:
+        languages: 認識する言語のタプル
+        device: 実行デバイス（"cpu"・"cuda"・"auto"、Noneの場合は環境変数OCR_DEVICE）
+
+    Returns:
+        EasyOCRのReader
+    """
+    gpu = resolve_ocr_device(device)
+    with _reader_lock:
+        return _create_easyocr_reader(tuple(languages), gpu)
 
 
 class OCRExtractor:
     """OCRを使用して画像から勤怠データを抽出"""
     
-    def __init__(self, use_easyocr: bool = True, poppler_path: Optional[str] = None):
+    def __init__(self, use_easyocr: bool = True, poppler_path: Optional[str] = None, pdf_dpi: int = 150, device: Optional[str] = None,
+                 page_cache_dir: Optional[str] = None):
         """
         初期化
         
         Args:
             use_easyocr: EasyOCRを使用するか（True: EasyOCR, False: Tesseract）
             poppler_path: Popplerのbinディレクトリパス（WindowsでPDF処理に必要）
+            pdf_dpi: PDFを画像に変換する際の解像度（デフォルト: 150）
+            device: EasyOCRの実行デバイス（"cpu"・"cuda"・"auto"、Noneの場合は環境変数OCR_DEVICE、未設定なら"auto"）
+            page_cache_dir: Popplerで変換したPDFのページ画像のキャッシュ先（Noneの場合はキャッシュしない。例: PDF_PAGE_CACHE_DIR）
         """
         self.use_easyocr = use_easyocr
+        self.pdf_dpi = pdf_dpi
+        self.page_cache_dir = page_cache_dir
         # pdf2imageが参照するPopplerパス（未指定なら環境変数も見る）
         self.poppler_path = poppler_path or os.environ.get("POPPLER_PATH")
         if self.poppler_path:
             self.poppler_path = os.path.expandvars(os.path.expanduser(str(self.poppler_path)))
         if use_easyocr:
             try:
-                self.reader = easyocr.Reader(['ja', 'en'], gpu=False)
+                # モデルの読み込みは重いため、インスタンス間で同じReaderを共有する
+                self.reader = get_easyocr_reader(('ja', 'en'), device=device)
             except Exception as e:
                 print(f"EasyOCRの初期化に失敗しました。Tesseractを使用します: {e}")
                 self.use_easyocr = False
@@ -47,29 +159,31 @@ class OCRExtractor:
         Returns:
             傾き角度（度）
         """
+        # 角度は縮小しても変わらないため、大きい画像は長辺1000px程度に縮小してから検出する
+        scale = SKEW_DETECTION_MAX_SIZE / max(image.shape[:2])
+        if scale < 1.0:
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        
         # エッジ検出
         edges = cv2.Canny(image, 50, 150, apertureSize=3)
         
         # Hough変換で直線を検出
-        lines = cv2.HoughLines(edges, 1, np.pi / 180, 200)
+        # しきい値は縮小後も変えない（下げると文字のエッジを直線として拾い、角度がずれるため）
+        # 使うのは水平線に近い直線（傾き45度以内）だけなので、投票する角度の範囲もその範囲に絞る
+        lines = cv2.HoughLines(edges, 1, np.pi / 180, 200, min_theta=np.pi / 4, max_theta=3 * np.pi / 4)
         
         if lines is None or len(lines) == 0:
             return 0.0
         
-        angles = []
-        for line in lines:
-            rho, theta = line[0]
-            # 水平線に近い角度のみを考慮（約0度または180度）
-            angle = np.degrees(theta) - 90
-            if abs(angle) < 45:  # 45度以内の傾きのみ
-                angles.append(angle)
+        # 水平線に近い角度のみを考慮（45度以内の傾きのみ、配列のまままとめて計算）
+        angles = np.degrees(lines[:, 0, 1]) - 90
+        angles = angles[np.abs(angles) < 45]
         
-        if not angles:
+        if angles.size == 0:
             return 0.0
         
         # 中央値を計算（外れ値の影響を減らす）
-        median_angle = np.median(angles)
-        return float(median_angle)
+        return float(np.median(angles))
     
     def deskew_image(self, image: np.ndarray) -> np.ndarray:
         """
@@ -81,11 +195,11 @@ class OCRExtractor:
         Returns:
             補正済み画像
         """
-        # グレースケールに変換（まだの場合）
+        # グレースケールに変換（まだの場合。傾き検出は画像を書き換えないため、グレースケール画像はコピーしない）
         if len(image.shape) == 3:
             gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
         else:
-            gray = image.copy()
+            gray = image
         
         # 傾き角度を検出
         angle = self.detect_skew_angle(gray)
@@ -111,15 +225,11 @@ class OCRExtractor:
         rotation_matrix[0, 2] += (new_w / 2) - center[0]
         rotation_matrix[1, 2] += (new_h / 2) - center[1]
         
-        # 画像を回転
-        if len(image.shape) == 3:
-            deskewed = cv2.warpAffine(image, rotation_matrix, (new_w, new_h), 
-                                     flags=cv2.INTER_CUBIC, 
-                                     borderMode=cv2.BORDER_REPLICATE)
-        else:
-            deskewed = cv2.warpAffine(image, rotation_matrix, (new_w, new_h), 
-                                     flags=cv2.INTER_CUBIC, 
-                                     borderMode=cv2.BORDER_REPLICATE)
+        # 画像を回転（カラー・グレースケールとも同じ処理）
+        # 数度程度の回転では線形補間でもOCR結果は変わらないため、バイキュービックより軽いINTER_LINEARを使う
+        deskewed = cv2.warpAffine(image, rotation_matrix, (new_w, new_h), 
+                                 flags=cv2.INTER_LINEAR, 
+                                 borderMode=cv2.BORDER_REPLICATE)
         
         return deskewed
     
@@ -141,60 +251,134 @@ class OCRExtractor:
         # 傾き補正
         img = self.deskew_image(img)
         
-        # グレースケールに変換
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        return self.preprocess_array(img)
+    
+    def preprocess_array(self, img: np.ndarray) -> np.ndarray:
+        """
+        傾き補正済み画像の前処理（ノイズ除去、コントラスト調整、二値化）
+        
+        Args:
+            img: 画像（numpy配列、BGRまたはグレースケール）
+        
+        Returns:
+            前処理済み画像（numpy配列）
+        """
+        # グレースケールに変換（まだの場合）
+        if len(img.shape) == 3:
+            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        else:
+            gray = img
+        
+        # ノイズのない画像は、ノイズ除去（前処理で最も重い）とコントラスト調整を省略してそのまま二値化する
+        hist = cv2.calcHist([gray], [0], None, [256], [0, 256]).ravel()
+        if np.partition(hist, -2)[-2:].sum() >= CLEAN_IMAGE_DOMINANT_RATIO * gray.size:
+            _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+            return binary
         
         # ノイズ除去
         denoised = cv2.fastNlMeansDenoising(gray, None, 10, 7, 21)
         
-        # コントラスト調整
+        # コントラスト調整と二値化は、ノイズ除去で新しく作った配列に上書きする（同じサイズの配列を追加で確保しないため）
+        # （grayは呼び出し元の画像そのものの場合があるため上書きしない）
         clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        enhanced = clahe.apply(denoised)
+        clahe.apply(denoised, denoised)
         
         # 二値化
-        _, binary = cv2.threshold(enhanced, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        cv2.threshold(denoised, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=denoised)
         
-        return binary
+        return denoised
     
-    def extract_text(self, image_path: str) -> str:
+    @staticmethod
+    def image_to_array(image: Image.Image) -> np.ndarray:
+        """
+        PIL画像をOpenCV形式のnumpy配列に変換
+        
+        Args:
+            image: PIL画像
+        
+        Returns:
+            グレースケール画像はそのまま2次元配列、それ以外はBGRの3次元配列
+        """
+        if image.mode == 'L':
+            return np.asarray(image)
+        return cv2.cvtColor(np.asarray(image.convert('RGB')), cv2.COLOR_RGB2BGR)
+    
+    def extract_text(self, image: Union[str, Image.Image, np.ndarray]) -> str:
         """
         画像からテキストを抽出
         
         Args:
-            image_path: 画像ファイルのパス
+            image: 画像ファイルのパス、PIL画像、またはnumpy配列（BGRまたはグレースケール）
         
         Returns:
             抽出されたテキスト
         """
         # 画像を読み込んで傾き補正
-        img = cv2.imread(image_path)
-        if img is None:
-            raise ValueError(f"画像を読み込めませんでした: {image_path}")
+        if isinstance(image, np.ndarray):
+            img = image
+        elif isinstance(image, Image.Image):
+            img = self.image_to_array(image)
+        else:
+            img = cv2.imread(image)
+            if img is None:
+                raise ValueError(f"画像を読み込めませんでした: {image}")
         
         # 傾き補正
         img = self.deskew_image(img)
         
-        # 一時ファイルとして保存（傾き補正済み画像）
-        temp_path = f"temp_deskewed_{os.path.basename(image_path)}"
-        cv2.imwrite(temp_path, img)
+        if self.use_easyocr and self.reader:
+            # EasyOCRを使用（傾き補正済み画像をファイルを経由せずに渡す）
+            results = self.reader.readtext(img)
+            return '\n'.join([result[1] for result in results])
         
-        try:
-            if self.use_easyocr and self.reader:
-                # EasyOCRを使用（傾き補正済み画像）
-                results = self.reader.readtext(temp_path)
-                text = '\n'.join([result[1] for result in results])
-            else:
-                # Tesseractを使用
-                # 前処理済み画像を使用
-                processed_img = self.preprocess_image(temp_path)
-                text = pytesseract.image_to_string(processed_img, lang='jpn+eng')
-        finally:
-            # 一時ファイルを削除
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-        
-        return text
+        # Tesseractを使用
+        # 傾き補正済み画像をファイルを経由せずに前処理して渡す
+        processed_img = self.preprocess_array(img)
+        import pytesseract
+        return pytesseract.image_to_string(processed_img, lang='jpn+eng')
     
+    def extract_texts(self, images: List[Union[Image.Image, np.ndarray]], batch_size: int = 4) -> List[str]:
+        """
+        複数ページの画像からテキストを抽出（ページごとの処理はスレッドで並列化し、EasyOCR使用時はまとめてバッチ推論する）
+
+        Args:
+            images: ページ画像のリスト（PIL画像、またはnumpy配列）
+            batch_size: EasyOCRの認識処理のバッチサイズ
+
+        Returns:
+            ページごとの抽出テキストのリスト
+        """
+        # ページごとの処理はスレッドで並列に行う（OpenCVの処理やTesseractの外部プロセス実行中はGILが解放される）
+        max_workers = min(len(images), os.cpu_count() or 1)
+
+        if not (self.use_easyocr and self.reader) or len(images) <= 1:
+            if max_workers <= 1:
+                return [self.extract_text(image) for image in images]
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                return list(executor.map(self.extract_text, images))
+
+        # 傾き補正はページごとに並列で行い、OCRはreadtext_batchedでまとめて実行する
+        # （EasyOCRの推論はPyTorch内部で並列化されるため、スレッドを分けて呼び出さない）
+        def _deskew_page(image: Union[Image.Image, np.ndarray]) -> np.ndarray:
+            return self.deskew_image(self.image_to_array(image) if isinstance(image, Image.Image) else image)
+
+        if max_workers <= 1:
+            pages = [_deskew_page(image) for image in images]
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                pages = list(executor.map(_deskew_page, images))
+        # readtext_batchedは同じサイズの画像しかまとめられないため、ページをサイズごとに分けてバッチ推論する
+        # （縦向き・横向きのページが混在する場合に、縦横比を変えて1つのサイズに揃えると認識精度が落ちるため）
+        groups: Dict[Tuple[int, int], List[int]] = {}
+        for index, page in enumerate(pages):
+            groups.setdefault(page.shape[:2], []).append(index)
+        texts: List[Optional[str]] = [None] * len(pages)
+        for indices in groups.values():
+            page_results = self.reader.readtext_batched([pages[i] for i in indices], batch_size=batch_size)
+            for index, results in zip(indices, page_results):
+                texts[index] = '\n'.join(result[1] for result in results)
+        return texts
+
     def parse_attendance_data(self, text: str) -> List[Dict[str, Union[int, Optional[str]]]]:
         """
         抽出したテキストから勤怠データをパース
@@ -205,13 +389,9 @@ class OCRExtractor:
         Returns:
             勤怠データのリスト（各要素は日付（日のみ）、出勤時刻、退勤時刻、状態を含む）
         """
-        import logging
-        logger = logging.getLogger(__name__)
-        
         attendance_records = []
         lines = text.split('\n')
         tokens = [ln.strip() for ln in lines if ln.strip()]
-        weekdays = {"月", "火", "水", "木", "金", "土", "日"}
 
         def _weekday(tok: str) -> Optional[str]:
             """
@@ -223,17 +403,8 @@ class OCRExtractor:
             Returns:
                 曜日文字（月、火、水、木、金、土、日）またはNone
             """
-            if not tok:
-                return None
-            
             # 文字列全体をチェック（最初の文字だけでなく）
-            for ch in tok:
-                if ch in weekdays:
-                    return ch
-            
-            # 最初の文字もチェック（既存の動作を維持）
-            ch = tok[0]
-            return ch if ch in weekdays else None
+            return next((ch for ch in tok if ch in WEEKDAY_CHARS), None)
 
         def _day(tok: str) -> Optional[int]:
             """
@@ -250,12 +421,12 @@ class OCRExtractor:
             
             # 時刻パターン（HH.MM や HH:MM）を含む場合は日付として扱わない
             # 例: "9.30", "18.30", "0:30" などは時刻なので日付ではない
-            if re.search(r"^\d{1,2}[\.:]\d{2}", tok):
+            if TIME_PREFIX_PATTERN.search(tok):
                 return None
             
             # 記号や空白を除去してから数字を抽出
             # "1 !" や "4 :" のような場合でも "1" や "4" を抽出
-            m = re.search(r"(\d{1,2})", tok)
+            m = DAY_NUMBER_PATTERN.search(tok)
             if not m:
                 return None
             try:
@@ -267,8 +438,8 @@ class OCRExtractor:
         logger.info("=" * 60)
         logger.info("勤怠データのパース開始")
         logger.info("=" * 60)
-        logger.info(f"トークン数: {len(tokens)}")
-        logger.info(f"最初の20トークン: {tokens[:20]}")
+        logger.info("トークン数: %d", len(tokens))
+        logger.info("最初の20トークン: %s", tokens[:20])
         
         # 日付を順番に取得する方式に変更
         # 1. まず日付（1-31）を探す
@@ -276,14 +447,28 @@ class OCRExtractor:
         # 3. その後のトークンから時刻を探す
         # 4. 日付が順番に存在することを前提に、欠落している日付の空レコードも作成
         
-        # 日付マップを作成（日付 -> トークンインデックス）
+        # トークンを1回だけ走査して、以降の処理で使う情報をまとめて作成する
+        # - token_days / token_times: トークンごとの日付・時刻（以降の探索では使い回す）
+        # - day_map: 日付 -> トークンインデックス（最初に見つかった日付のみ記録）
+        # - next_day_indices: 各トークンより後ろで、より大きい日付が最初に現れる位置（なければ終端）
+        #   （日ごとにトークンの残りを走査しないよう、スタックを使って求める）
+        token_days: List[Optional[int]] = []
+        token_times: List[List[str]] = []
         day_map: Dict[int, int] = {}  # day -> token_index
+        next_day_indices = [len(tokens)] * len(tokens)
+        pending: List[int] = []  # 次の日付がまだ見つかっていないトークンのインデックス（日付は降順）
         for idx, tok in enumerate(tokens):
             day = _day(tok)
-            if day is not None:
-                if day not in day_map:  # 最初に見つかった日付のみ記録
-                    day_map[day] = idx
-                    logger.info(f"日付検出: 日={day}, インデックス={idx}, トークン='{tok}'")
+            token_days.append(day)
+            token_times.append(TIME_PATTERN.findall(tok))
+            if day is None:
+                continue
+            if day not in day_map:
+                day_map[day] = idx
+                logger.info("日付検出: 日=%d, インデックス=%d, トークン='%s'", day, idx, tok)
+            while pending and token_days[pending[-1]] < day:
+                next_day_indices[pending.pop()] = idx
+            pending.append(idx)
         
         # 日付の範囲を取得（最小日と最大日）
         if not day_map:
@@ -292,7 +477,7 @@ class OCRExtractor:
         
         min_day = min(day_map.keys())
         max_day = max(day_map.keys())
-        logger.info(f"日付範囲: {min_day}日 ～ {max_day}日")
+        logger.info("日付範囲: %d日 ～ %d日", min_day, max_day)
         
         # 1日から最大日まで順番に処理
         for expected_day in range(1, max_day + 1):
@@ -309,35 +494,31 @@ class OCRExtractor:
                 if next_idx < len(tokens):
                     weekday = _weekday(tokens[next_idx])
                     if weekday:
-                        logger.info(f"日={day}: 曜日検出='{weekday}' (インデックス={next_idx})")
+                        logger.info("日=%d: 曜日検出='%s' (インデックス=%d)", day, weekday, next_idx)
                         start_scan_idx = next_idx + 1  # 曜日の次のトークンから時刻を探す
                     else:
                         # 曜日が見つからない場合、記号や数字の可能性を考慮
                         tok = tokens[next_idx]
-                        is_time_pattern = bool(re.search(r"(\d{1,2}[\.:]\d{2})", tok))
-                        is_day_number = _day(tok) is not None
+                        is_time_pattern = bool(token_times[next_idx])
+                        is_day_number = token_days[next_idx] is not None
                         
                         if is_time_pattern:
                             # 時刻パターンの場合、曜日なしとして扱う
-                            logger.warning(f"日={day}: 曜日が見つかりませんでした（次のトークンは時刻パターン: '{tok}'）")
+                            logger.warning("日=%d: 曜日が見つかりませんでした（次のトークンは時刻パターン: '%s'）", day, tok)
                             start_scan_idx = next_idx  # このトークンから時刻を探す
                         elif is_day_number:
                             # 次の日付の場合、時刻なしとして扱う
-                            logger.warning(f"日={day}: 曜日が見つかりませんでした（次のトークンは日付: '{tok}'）")
+                            logger.warning("日=%d: 曜日が見つかりませんでした（次のトークンは日付: '%s'）", day, tok)
                             start_scan_idx = len(tokens)  # 時刻なし（探索範囲外）
                         else:
                             # 記号やその他の文字の場合、スキップして次のトークンから探す
-                            logger.warning(f"日={day}: 曜日が見つかりませんでした（次のトークンは記号など: '{tok}'）。スキップして時刻を探します。")
+                            logger.warning("日=%d: 曜日が見つかりませんでした（次のトークンは記号など: '%s'）。スキップして時刻を探します。", day, tok)
                             start_scan_idx = next_idx + 1  # このトークンをスキップ
                 
                 # 次の日付の位置を事前に取得（探索範囲を限定するため）
-                next_day_idx = len(tokens)  # デフォルトは終端
-                for check_idx in range(i + 1, len(tokens)):
-                    check_day = _day(tokens[check_idx])
-                    if check_day is not None and check_day > day:
-                        next_day_idx = check_idx
-                        logger.info(f"  日={day}: 次の日付（{check_day}）を検出: インデックス={check_idx}")
-                        break
+                next_day_idx = next_day_indices[i]
+                if next_day_idx < len(tokens):
+                    logger.info("  日=%d: 次の日付（%d）を検出: インデックス=%d", day, token_days[next_day_idx], next_day_idx)
                 
                 # 次の日付が見つかるまで、または終端まで時刻を探す
                 found_times: List[str] = []
@@ -348,18 +529,19 @@ class OCRExtractor:
                     tok = tokens[j]
                     
                     # 休暇の検出
-                    if "休" in tok or tok in {"欠", "休"} or re.search(r"休(暇|日|業|吸)", tok):
+                    # 「休暇」「休日」なども含め「休」を含むトークン、または「欠」のみのトークン
+                    if "休" in tok or tok == "欠":
                         off_flag = True
-                        logger.info(f"  日={day}: 休暇検出='{tok}' (インデックス={j})")
+                        logger.info("  日=%d: 休暇検出='%s' (インデックス=%d)", day, tok, j)
                     
                     # 時刻の抽出（最初の2つの時刻のみ取得）
-                    for raw in re.findall(r"(\d{1,2}[\.:]\d{2})", tok):
+                    for raw in token_times[j]:
                         if len(found_times) >= 2:
                             break  # 2つ取得したら終了
                         nt = normalize_time(raw)
                         if nt:
                             found_times.append(nt)
-                            logger.info(f"  日={day}: 時刻検出 '{raw}' -> '{nt}' (トークン='{tok}', インデックス={j})")
+                            logger.info("  日=%d: 時刻検出 '%s' -> '%s' (トークン='%s', インデックス=%d)", day, raw, nt, tok, j)
                     
                     j += 1
                 
@@ -385,12 +567,12 @@ class OCRExtractor:
                 attendance_records.append(record)
                 
                 logger.info(
-                    f"レコード抽出 [{len(attendance_records)}]: 日={day}, 曜={weekday or '？'}, "
-                    f"出勤={start_time or 'なし'}, 退勤={end_time or 'なし'}, 状態={status}"
+                    "レコード抽出 [%d]: 日=%d, 曜=%s, 出勤=%s, 退勤=%s, 状態=%s",
+                    len(attendance_records), day, weekday or '？', start_time or 'なし', end_time or 'なし', status
                 )
             else:
                 # 日付が見つからなかった場合、空のレコードを作成
-                logger.warning(f"日={expected_day}: 日付が見つかりませんでした。空のレコードを作成します。")
+                logger.warning("日=%d: 日付が見つかりませんでした。空のレコードを作成します。", expected_day)
                 record = {
                     "day": expected_day,
                     "weekday": None,
@@ -403,7 +585,7 @@ class OCRExtractor:
                 attendance_records.append(record)
         
         logger.info("=" * 60)
-        logger.info(f"パース完了: {len(attendance_records)}件のレコードを抽出")
+        logger.info("パース完了: %d件のレコードを抽出", len(attendance_records))
         logger.info("=" * 60)
         
         return attendance_records
@@ -426,29 +608,92 @@ class OCRExtractor:
         
         # データパース
         attendance_data = self.parse_attendance_data(text)
-        
+
         return attendance_data
-    
-    def extract_from_pdf(self, pdf_path: str) -> List[Dict[str, Optional[str]]]:
+
+    def extract_from_texts(self, texts: List[str]) -> List[Dict[str, Optional[str]]]:
         """
-        PDFファイルから勤怠データを抽出（各ページを画像として処理）
-        
+        OCR済みのページテキストから勤怠データを抽出（OCRを再実行しない）
+
         Args:
-            pdf_path: PDFファイルのパス
-        
+            texts: ページごとの抽出テキストのリスト
+
         Returns:
             勤怠データのリスト
         """
+        all_records = []
+        for text in texts:
+            all_records.extend(self.parse_attendance_data(text))
+        return all_records
+
+    def convert_pdf_to_images(self, pdf_path: str) -> list:
+        """
+        PDFファイルをページごとの画像に変換
+
+        Args:
+            pdf_path: PDFファイルのパス
+
+        Returns:
+            ページ画像（PIL.Image）のリスト
+        """
         if not os.path.exists(pdf_path):
             raise FileNotFoundError(f"PDFファイルが見つかりません: {pdf_path}")
 
-        try:
-            from pdf2image import convert_from_path
-        except ImportError:
-            raise ImportError("PDF処理にはpdf2imageが必要です。pip install pdf2imageでインストールしてください。")
-        
-        # PDFを画像に変換
-        kwargs = {}
+        # PyMuPDFでの変換はキャッシュの読み込みより速いため、キャッシュはPopplerで変換する場合のみ使う
+        if pymupdf is not None:
+            return self._render_pdf_with_pymupdf(pdf_path)
+
+        # 変換済みのページ画像があれば、Popplerでの変換を省略する
+        cache_path = self._page_cache_path(pdf_path)
+        if cache_path:
+            images = self._load_cached_pages(cache_path)
+            if images is not None:
+                logger.info("PDFのページ画像をキャッシュから読み込みました: %dページ", len(images))
+                return images
+
+        images = self._render_pdf_with_poppler(pdf_path)
+
+        if cache_path:
+            self._save_cached_pages(cache_path, images)
+        return images
+
+    def _render_pdf_with_pymupdf(self, pdf_path: str) -> list:
+        """
+        PyMuPDFでPDFをページごとの画像に変換（外部プロセスを起動せず、プロセス内で変換する）
+
+        Args:
+            pdf_path: PDFファイルのパス
+
+        Returns:
+            ページ画像（PIL.Image、グレースケール）のリスト
+        """
+        images = []
+        with pymupdf.open(pdf_path) as doc:
+            for page in doc:
+                # OCR用途のためグレースケールで変換する（pdf2imageでの変換と同じ条件）
+                pixmap = page.get_pixmap(dpi=self.pdf_dpi, colorspace=pymupdf.csGRAY)
+                images.append(Image.frombytes("L", (pixmap.width, pixmap.height), pixmap.samples))
+        return images
+
+    def _render_pdf_with_poppler(self, pdf_path: str) -> list:
+        """
+        pdf2image（Poppler）でPDFをページごとの画像に変換
+
+        Args:
+            pdf_path: PDFファイルのパス
+
+        Returns:
+            ページ画像（PIL.Image）のリスト
+        """
+        if convert_from_path is None:
+            raise ImportError("PDF処理にはPyMuPDFまたはpdf2imageが必要です。pip install pymupdf（またはpip install pdf2image）でインストールしてください。")
+        
+        # PDFを画像に変換（OCR用途のためグレースケール・低解像度で変換し、Popplerのスレッドで並列化）
+        kwargs = {
+            "dpi": self.pdf_dpi,
+            "grayscale": True,
+            "thread_count": os.cpu_count() or 1,
+        }
         if self.poppler_path:
             if not os.path.isdir(self.poppler_path):
                 raise FileNotFoundError(
@@ -473,20 +718,105 @@ class OCRExtractor:
                     "（例: C:\\poppler\\Library\\bin）"
                 ) from e
             raise
-        
-        all_records = []
-        for i, image in enumerate(images):
-            # 一時ファイルとして保存
-            temp_path = f"temp_pdf_page_{i}.png"
-            image.save(temp_path, 'PNG')
-            
-            try:
-                records = self.extract_from_image(temp_path)
-                all_records.extend(records)
-            finally:
-                # 一時ファイルを削除
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
-        
-        return all_records
+
+        return images
+
+    def _page_cache_path(self, pdf_path: str) -> Optional[str]:
+        """
+        PDFのページ画像のキャッシュ先を取得（ファイル内容のハッシュ＋解像度）
+
+        Args:
+            pdf_path: PDFファイルのパス
+
+        Returns:
+            キャッシュのディレクトリパス（キャッシュしない場合はNone）
+        """
+        if not self.page_cache_dir:
+            return None
+        hasher = hashlib.sha256()
+        with open(pdf_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                hasher.update(chunk)
+        return os.path.join(self.page_cache_dir, f"{hasher.hexdigest()}_{self.pdf_dpi}")
+
+    def _load_cached_pages(self, cache_path: str) -> Optional[list]:
+        """
+        キャッシュからページ画像を読み込む
+
+        Args:
+            cache_path: キャッシュのディレクトリパス
+
+        Returns:
+            ページ画像（PIL.Image）のリスト、キャッシュがない場合はNone
+        """
+        try:
+            page_files = sorted(name for name in os.listdir(cache_path) if name.endswith('.png'))
+            images = []
+            for name in page_files:
+                image = Image.open(os.path.join(cache_path, name))
+                image.load()
+                images.append(image)
+            # 最近使ったものを残すため、更新日時を使用時刻にする
+            os.utime(cache_path)
+            return images
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning("PDFのページ画像キャッシュの読み込みに失敗: %s: %s", cache_path, e)
+            return None
+
+    def _save_cached_pages(self, cache_path: str, images: list) -> None:
+        """
+        ページ画像をキャッシュに保存し、古いキャッシュを削除する
+
+        Args:
+            cache_path: キャッシュのディレクトリパス
+            images: ページ画像（PIL.Image）のリスト
+        """
+        # 書き込み途中のキャッシュを読まないよう、一時ディレクトリに書いてから置き換える
+        # （Streamlitでは同じプロセスの複数セッションが同時に同じPDFを変換しうるため、一時ディレクトリは呼び出しごとに作る）
+        temp_path = None
+        try:
+            os.makedirs(self.page_cache_dir, exist_ok=True)
+            temp_path = tempfile.mkdtemp(dir=self.page_cache_dir, suffix='.tmp')
+            for page_no, image in enumerate(images, 1):
+                # 読み込み直しの速さを優先して、圧縮レベルは低くする
+                image.save(os.path.join(temp_path, f"page_{page_no:04d}.png"), compress_level=1)
+            # 他のセッションが先に保存した場合は、そのキャッシュを使う
+            if not os.path.isdir(cache_path):
+                os.replace(temp_path, cache_path)
+
+            # 上限を超えた分は最後に使われた日時が古いものから削除
+            entries = sorted(
+                (entry for entry in os.scandir(self.page_cache_dir) if entry.is_dir() and not entry.name.endswith('.tmp')),
+                key=lambda entry: entry.stat().st_mtime,
+                reverse=True,
+            )
+            for entry in entries[PDF_PAGE_CACHE_MAX_ENTRIES:]:
+                shutil.rmtree(entry.path, ignore_errors=True)
+        except OSError as e:
+            logger.warning("PDFのページ画像キャッシュの保存に失敗: %s", e)
+        finally:
+            if temp_path:
+                shutil.rmtree(temp_path, ignore_errors=True)
+
+    def extract_from_pdf(self, pdf_path: str, precomputed_texts: Optional[List[str]] = None) -> List[Dict[str, Optional[str]]]:
+        """
+        PDFファイルから勤怠データを抽出（各ページを画像として処理）
+
+        Args:
+            pdf_path: PDFファイルのパス
+            precomputed_texts: OCR済みのページテキスト（指定時は画像変換とOCRを省略）
+
+        Returns:
+            勤怠データのリスト
+        """
+        if precomputed_texts is not None:
+            return self.extract_from_texts(precomputed_texts)
+
+        images = self.convert_pdf_to_images(pdf_path)
+
+        # ページ画像はPNGに保存せず、メモリ上のままOCRに渡す（エンコード・ファイル書き込みを省略）
+        texts = self.extract_texts(images)
+        return self.extract_from_texts(texts)
 
@@ -2,6 +2,7 @@
 レコルへの自動ログインと勤怠データ入力
 """
 import time
+from datetime import datetime
 from typing import List, Dict, Optional
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -12,13 +13,167 @@ from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from webdriver_manager.chrome import ChromeDriverManager
 import logging
+from functools import lru_cache
 from src.utils import build_date_from_components
 
 
+# ヘッドレス実行時に追加するChromeの起動オプション（描画・バックグラウンド処理を抑えてページ読み込みを軽くする）
+HEADLESS_CHROME_ARGS = [
+    '--disable-gpu',
+    '--disable-extensions',
+    '--disable-background-timer-throttling',
+    '--disable-renderer-backgrounding',
+    '--blink-settings=imagesEnabled=false',  # フォーム入力に画像は不要
+    '--disable-background-networking',
+    '--disable-features=Translate,BackForwardCache',
+]
+
+# ヘッドレス実行時に設定するChromeの設定（画像の読み込み自体を止める。プロファイル指定時は使わない）
+HEADLESS_CHROME_PREFS = {
+    'profile.managed_default_content_settings.images': 2,
+}
+
+# ログインボタンを押してからページ遷移を待つ最大秒数
+LOGIN_TRANSITION_TIMEOUT = 10
+
+# ページ読み込みの待ち方（eager: HTMLの解析が終わった時点でdriver.get()から戻る。画像などの読み込みは待たない）
+# 操作に必要な要素は、ログイン後の遷移・勤怠の行の表示をWebDriverWaitで明示的に待つ
+PAGE_LOAD_STRATEGY = 'eager'
+
+# 勤怠入力ページの表示（勤怠の行が現れるまで）を待つ最大秒数
+ATTENDANCE_PAGE_TIMEOUT = 15
+
+# 勤怠入力ページの行内の入力欄を探すCSSセレクター（先頭から順に試す。{date_ymd}を含むものは日付が分かる場合のみ使う）
+ROW_FIELD_SELECTORS = {
+    'attend': (
+        "select.ID-attendKbn-{date_ymd}-1",
+        "select[name*='attendId'][name*='{date_ymd}']",
+        "select[name*='attendId']",
+        "select.ID-attendKbn",
+        "select[class*='attendKbn']",
+    ),
+    'start': (
+        "input.ID-worktimeStart-{date_ymd}-1",
+        "input[name*='worktimeStart'][name*='{date_ymd}']",
+        "input[name*='worktimeStart']",
+        "input.worktimeStart",
+        "input[class*='worktimeStart']",
+    ),
+    'end': (
+        "input.ID-worktimeEnd-{date_ymd}-1",
+        "input[name*='worktimeEnd'][name*='{date_ymd}']",
+        "input[name*='worktimeEnd']",
+        "input.worktimeEnd",
+        "input[class*='worktimeEnd']",
+    ),
+    'memo': (
+        "input.ID-worktimeMemo-{date_ymd}-1",
+        "input[name*='worktimeMemo'][name*='{date_ymd}']",
+        "input[name*='worktimeMemo']",
+        "input.worktimeMemo",
+        "input[class*='worktimeMemo']",
+    ),
+}
+
+# 行内の入力欄を種類ごとに探す関数（セレクターを先頭から順に試し、見つからない入力欄はnull）
+ROW_FIELDS_FUNCTION = """
+const pickRowFields = (row, selectors) => {
+    const fields = {};
+    for (const [field, candidates] of Object.entries(selectors)) {
+        fields[field] = null;
+        for (const selector of candidates) {
+            const element = row.querySelector(selector);
+            if (element) {
+                fields[field] = element;
+                break;
+            }
+        }
+    }
+    return fields;
+};
+"""
+
+# 行内の入力欄をまとめて取得するスクリプト（引数は行のtr要素とセレクターの辞書、WebElementの辞書を返す）
+RESOLVE_ROW_FIELDS_SCRIPT = ROW_FIELDS_FUNCTION + """
+return pickRowFields(arguments[0], arguments[1]);
+"""
+
+# select要素の値を選択して変更イベントを発生させるスクリプト（引数はselect要素と値、該当する選択肢がない場合はfalseを返す）
+SELECT_VALUE_SCRIPT = """
+const [select, value] = arguments;
+if (!Array.from(select.options).some((option) => option.value === value)) { return false; }
+select.value = value;
+select.dispatchEvent(new Event('change', {bubbles: true}));
+return true;
+"""
+
+# 1行分の入力をブラウザ側でまとめて行う関数（WebDriverへのコマンド送信を減らす）
+# 必要な入力欄がすべて見つかった場合のみ値を書き換え、結果をステータス文字列で返す
+# （'ok': 入力した, 'existing': 既に入力がある, それ以外: 入力していない）
+FILL_ROW_FUNCTION = ROW_FIELDS_FUNCTION + """
+const fillRow = (rowId, selectors, attendId, startTime, endTime, memo) => {
+    const row = document.getElementById(rowId);
+    if (!row) { return 'row-not-found'; }
+    const fields = pickRowFields(row, selectors);
+    if ((fields.start && fields.start.value.trim()) || (fields.end && fields.end.value.trim())) {
+        return 'existing';
+    }
+    if (!fields.attend) { return 'attend-not-found'; }
+    // 勤怠区分の選択肢がない場合は、空欄のまま'ok'にしないよう入力しない（SELECT_VALUE_SCRIPTと同じ確認）
+    if (!Array.from(fields.attend.options || []).some((option) => option.value === attendId)) {
+        return 'attend-option-not-found';
+    }
+    if (startTime && !fields.start) { return 'start-not-found'; }
+    if (endTime && !fields.end) { return 'end-not-found'; }
+    if (memo && !fields.memo) { return 'memo-not-found'; }
+    if (typeof setAttendanceChangeFlag !== 'function') { return 'change-flag-not-found'; }
+    const setValue = (element, value) => {
+        element.value = value;
+        for (const type of ['input', 'change', 'blur']) {
+            element.dispatchEvent(new Event(type, {bubbles: true}));
+        }
+    };
+    setValue(fields.attend, attendId);
+    if (startTime) { setValue(fields.start, startTime); }
+    if (endTime) { setValue(fields.end, endTime); }
+    if (memo) { setValue(fields.memo, memo); }
+    setAttendanceChangeFlag(rowId.slice('tr-'.length));
+    return 'ok';
+};
+"""
+
+# 1行分を入力するスクリプト（引数はRecoruClient._row_script_argsの戻り値）
+FILL_ROW_SCRIPT = FILL_ROW_FUNCTION + """
+return fillRow(...arguments);
+"""
+
+# 複数行をまとめて入力するスクリプト（引数は_row_script_argsの戻り値のリスト、行ごとのステータスのリストを返す）
+FILL_ROWS_SCRIPT = FILL_ROW_FUNCTION + """
+return arguments[0].map((args) => {
+    try {
+        return fillRow(...args);
+    } catch (e) {
+        return 'error: ' + e;
+    }
+});
+"""
+
+
+@lru_cache(maxsize=1)
+def get_chromedriver_path() -> str:
+    """
+    ChromeDriverのパスを取得（同じプロセス内では2回目以降はインストール済みのパスを使い回す）
+    
+    Returns:
+        ChromeDriverの実行ファイルのパス
+    """
+    return ChromeDriverManager().install()
+
+
 class RecoruClient:
     """レコルへの自動ログインと勤怠データ入力クライアント"""
     
-    def __init__(self, contract_id: str, login_id: str, password: str, headless: bool = False, base_url: Optional[str] = None, profile_path: Optional[str] = None, login_retry_count: int = 3, login_retry_interval: int = 5):
+    def __init__(self, contract_id: str, login_id: str, password: str, headless: bool = False, base_url: Optional[str] = None, profile_path: Optional[str] = None, login_retry_count: int = 3, login_retry_interval: int = 5, chrome_args: Optional[List[str]] = None, debugger_address: Optional[str] = None):
         """
         初期化
         
@@ -31,6 +186,9 @@ class RecoruClient:
             profile_path: Chromeのプロファイルパス（例: C:\\Users\\username\\AppData\\Local\\Google\\Chrome\\User Data）
             login_retry_count: ログインリトライ回数（デフォルト: 3）
             login_retry_interval: ログインリトライ間隔（秒、デフォルト: 5）
+            chrome_args: Chromeに追加で渡す起動オプション（例: HEADLESS_CHROME_ARGS）
+            debugger_address: 起動済みのChromeのリモートデバッグのアドレス（例: 127.0.0.1:9222）。
+                接続できる場合はChromeを新しく起動せず、そのChromeを使う
         """
         self.contract_id = contract_id
         self.login_id = login_id
@@ -40,7 +198,11 @@ class RecoruClient:
         self.profile_path = profile_path
         self.login_retry_count = login_retry_count
         self.login_retry_interval = login_retry_interval
+        self.chrome_args = list(chrome_args) if chrome_args else []
+        self.debugger_address = debugger_address
         self.driver = None
+        # 複数レコード入力時に最後にまとめて設定する変更フラグ（行のキー: YYYYMMDD-1）
+        self._pending_change_flags: List[str] = []
         self.logger = logging.getLogger(__name__)
     
     def _close_existing_chrome(self, profile_path: str):
@@ -74,16 +236,52 @@ class RecoruClient:
                 except Exception as e:
                     self.logger.warning(f"ロックファイルの削除中にエラー: {e}")
     
+    def _is_debugger_reachable(self) -> bool:
+        """
+        debugger_addressのChromeに接続できるか確認
+        
+        Returns:
+            接続できる場合True
+        """
+        import socket
+        host, _, port = self.debugger_address.rpartition(':')
+        try:
+            with socket.create_connection((host or '127.0.0.1', int(port)), timeout=1):
+                return True
+        except (OSError, ValueError):
+            return False
+    
     def _setup_driver(self):
         """Seleniumドライバーをセットアップ"""
+        # 起動済みのChromeに接続できる場合は、Chromeを起動せずに接続する（起動時間を省くため）
+        # 接続時は起動オプション（ヘッドレス・プロファイルなど）は使えないため、debuggerAddressのみ指定する
+        if self.debugger_address:
+            if self._is_debugger_reachable():
+                chrome_options = Options()
+                chrome_options.page_load_strategy = PAGE_LOAD_STRATEGY
+                chrome_options.add_experimental_option("debuggerAddress", self.debugger_address)
+                service = Service(get_chromedriver_path())
+                self.driver = webdriver.Chrome(service=service, options=chrome_options)
+                self.driver.implicitly_wait(0)
+                self.logger.info(f"起動済みのChromeに接続しました: {self.debugger_address}")
+                return
+            self.logger.warning(f"起動済みのChromeに接続できないため、Chromeを起動します: {self.debugger_address}")
+        
         chrome_options = Options()
+        chrome_options.page_load_strategy = PAGE_LOAD_STRATEGY
         if self.headless:
-            chrome_options.add_argument('--headless')
+            chrome_options.add_argument('--headless=new')
         chrome_options.add_argument('--no-sandbox')
         chrome_options.add_argument('--disable-dev-shm-usage')
         chrome_options.add_argument('--disable-blink-features=AutomationControlled')
+        for arg in self.chrome_args:
+            chrome_options.add_argument(arg)
         chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
         chrome_options.add_experimental_option('useAutomationExtension', False)
+        # prefsはプロファイルのPreferencesファイルに書き込まれるため、プロファイル指定時は使わない
+        # （普段使いのプロファイルで画像が表示されなくなるため。画像の読み込みは--blink-settingsで止める）
+        if self.headless and not self.profile_path:
+            chrome_options.add_experimental_option('prefs', HEADLESS_CHROME_PREFS)
         
         # プロファイルパスが指定されている場合は使用
         if self.profile_path:
@@ -103,8 +301,11 @@ class RecoruClient:
         # ユーザーエージェントを設定（ボット検出を回避）
         chrome_options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
         
-        service = Service(ChromeDriverManager().install())
+        service = Service(get_chromedriver_path())
         self.driver = webdriver.Chrome(service=service, options=chrome_options)
+        # 要素が見つからない場合はすぐに失敗させる（セレクターを順に試す箇所で見つからないたびに待たないため）
+        # 待つ必要がある箇所はWebDriverWaitで明示的に待つ
+        self.driver.implicitly_wait(0)
         self.driver.maximize_window()
     
     def _is_login_page(self) -> bool:
@@ -139,6 +340,40 @@ class RecoruClient:
             self.logger.warning(f"ログインページの確認中にエラー: {e}")
             return False
     
+    def _wait_for_document_ready(self, timeout: float = LOGIN_TRANSITION_TIMEOUT):
+        """
+        表示中のページの読み込み完了（document.readyState == "complete"）を待つ
+        
+        Args:
+            timeout: 最大待機秒数
+        
+        Raises:
+            TimeoutException: 時間内に読み込みが完了しなかった場合
+        """
+        WebDriverWait(self.driver, timeout).until(
+            lambda driver: driver.execute_script("return document.readyState") == "complete"
+        )
+    
+    def _wait_for_attendance_ready(self, timeout: float = ATTENDANCE_PAGE_TIMEOUT) -> bool:
+        """
+        勤怠入力ページのHTMLの解析完了と勤怠の行（tr-YYYYMMDD-N）の表示を待つ（画像などの読み込み完了は待たない）
+        
+        Args:
+            timeout: 最大待機秒数
+        
+        Returns:
+            時間内に表示された場合True（表示されなかった場合は警告を出してFalse）
+        """
+        try:
+            WebDriverWait(self.driver, timeout).until(
+                lambda driver: driver.execute_script("return document.readyState") != "loading"
+                and driver.find_elements(By.CSS_SELECTOR, "tr[id^='tr-']")
+            )
+            return True
+        except TimeoutException:
+            self.logger.warning(f"勤怠入力ページの表示を{timeout}秒待ちましたが、勤怠の行が見つかりませんでした")
+            return False
+    
     def _attempt_login(self) -> bool:
         """
         ログイン試行（1回）
@@ -157,15 +392,13 @@ class RecoruClient:
             # base_urlが指定されている場合は、まずそのURLに遷移
             if self.base_url:
                 self.logger.info(f"指定されたURLに遷移: {self.base_url}")
-                self.driver.get(self.base_url)
-                time.sleep(2)  # ページ読み込みを待つ
+                self.driver.get(self.base_url)  # 読み込み後のフォーム表示は下のWebDriverWaitで待つ
                 current_url = self.driver.current_url
             
             # 現在のページがログインページでない場合は、ログインページに遷移
             if not self._is_login_page():
                 self.logger.info(f"現在のURL ({current_url}) がログインページではないため、ログインページに遷移します")
-                self.driver.get(login_url)
-                time.sleep(2)  # ページ読み込みを待つ
+                self.driver.get(login_url)  # 読み込み後のフォーム表示は下のWebDriverWaitで待つ
             else:
                 self.logger.info(f"現在のURL ({current_url}) はログインページです")
             
@@ -205,7 +438,6 @@ class RecoruClient:
             contract_field.clear()
             contract_field.send_keys(self.contract_id)
             self.logger.info("契約IDを入力しました")
-            time.sleep(0.5)
             
             # ログインIDフィールドを探して入力（実際のフォームでは authId）
             login_field = None
@@ -221,7 +453,6 @@ class RecoruClient:
             login_field.clear()
             login_field.send_keys(self.login_id)
             self.logger.info("ログインIDを入力しました")
-            time.sleep(0.5)
             
             # パスワードフィールドを探して入力
             password_field = None
@@ -237,7 +468,10 @@ class RecoruClient:
             password_field.clear()
             password_field.send_keys(self.password)
             self.logger.info("パスワードを入力しました")
-            time.sleep(0.5)
+            
+            # ログイン後のページ遷移を検出するため、クリック前のURLとフォームを控えておく
+            url_before_submit = self.driver.current_url
+            login_form_before_submit = self.driver.find_element(By.ID, "loginForm")
             
             # ログインボタンをクリック（実際のフォームでは submit ボタンをクリック）
             submit_button = None
@@ -257,8 +491,15 @@ class RecoruClient:
                     self.driver.execute_script("$('#submit').click();")
                     self.logger.info("JavaScriptでログインボタンをクリックしました")
             
-            # ログイン後のページ遷移を待機
-            time.sleep(3)
+            # ログイン後のページ遷移を待機（固定時間は待たず、URLが変わるかログインフォームが破棄された時点で次へ進む）
+            try:
+                WebDriverWait(self.driver, LOGIN_TRANSITION_TIMEOUT).until(
+                    lambda driver: driver.current_url != url_before_submit
+                    or EC.staleness_of(login_form_before_submit)(driver)
+                )
+                self._wait_for_document_ready()
+            except TimeoutException:
+                self.logger.warning(f"ログイン後のページ遷移を{LOGIN_TRANSITION_TIMEOUT}秒以内に確認できませんでした")
             
             # ログイン成功の確認（URLの変更や特定の要素の出現を確認）
             current_url = self.driver.current_url
@@ -289,8 +530,7 @@ class RecoruClient:
                 # base_urlが指定されている場合で、現在のURLがbase_urlと異なる場合は遷移
                 if self.base_url and self.base_url not in current_url:
                     self.logger.info(f"指定されたURLに遷移: {self.base_url}")
-                    self.driver.get(self.base_url)
-                    time.sleep(2)  # ページ読み込みを待つ
+                    self.driver.get(self.base_url)  # eagerのためDOMの構築完了で戻る（勤怠行の表示は入力処理側で待つ）
                     self.logger.info(f"URL遷移完了: {self.driver.current_url}")
                 
                 return True
@@ -304,8 +544,7 @@ class RecoruClient:
                         # base_urlが指定されている場合で、現在のURLがbase_urlと異なる場合は遷移
                         if self.base_url and self.base_url not in current_url:
                             self.logger.info(f"指定されたURLに遷移: {self.base_url}")
-                            self.driver.get(self.base_url)
-                            time.sleep(2)  # ページ読み込みを待つ
+                            self.driver.get(self.base_url)  # eagerのためDOMの構築完了で戻る（勤怠行の表示は入力処理側で待つ）
                             self.logger.info(f"URL遷移完了: {self.driver.current_url}")
                         
                         return True
@@ -315,8 +554,7 @@ class RecoruClient:
                     # base_urlが指定されている場合で、現在のURLがbase_urlと異なる場合は遷移
                     if self.base_url and self.base_url not in current_url:
                         self.logger.info(f"指定されたURLに遷移: {self.base_url}")
-                        self.driver.get(self.base_url)
-                        time.sleep(2)  # ページ読み込みを待つ
+                        self.driver.get(self.base_url)  # eagerのためDOMの構築完了で戻る（勤怠行の表示は入力処理側で待つ）
                         self.logger.info(f"URL遷移完了: {self.driver.current_url}")
                     
                     return True
@@ -362,13 +600,161 @@ class RecoruClient:
         
         return False
     
-    def input_attendance(self, record: Dict[str, Optional[str]], skip_reload: bool = False) -> bool:
+    @staticmethod
+    def _row_field_selectors(field: str, date_ymd: Optional[str]) -> List[str]:
+        """
+        行内の入力欄を探すCSSセレクターのリストを取得
+        
+        Args:
+            field: 入力欄の種類（attend, start, end, memo）
+            date_ymd: 日付（YYYYMMDD形式、不明な場合はNone）
+        
+        Returns:
+            先頭から順に試すCSSセレクターのリスト
+        """
+        if date_ymd:
+            return [selector.format(date_ymd=date_ymd) for selector in ROW_FIELD_SELECTORS[field]]
+        return [selector for selector in ROW_FIELD_SELECTORS[field] if '{date_ymd}' not in selector]
+    
+    @staticmethod
+    def _to_date_ymd(date_str: Optional[str]) -> Optional[str]:
+        """
+        YYYY-MM-DD形式の日付をYYYYMMDD形式に変換
+        
+        Args:
+            date_str: 日付（build_date_from_componentsの戻り値）
+        
+        Returns:
+            日付（YYYYMMDD形式）、日付が分からない場合はNone
+        """
+        if not date_str:
+            return None
+        try:
+            return datetime.strptime(date_str, '%Y-%m-%d').strftime('%Y%m%d')
+        except ValueError:
+            return None
+    
+    @staticmethod
+    def _to_hhmm(time_str: Optional[str]) -> str:
+        """
+        HH:MM形式の時刻をレコルの入力欄の形式（HHMM）に変換
+        
+        Args:
+            time_str: 時刻文字列（HH:MM形式、未入力の場合はNone）
+        
+        Returns:
+            HHMM形式の時刻（未入力の場合は空文字列）
+        """
+        return (time_str or '').replace(':', '')
+    
+    def _row_selectors(self, date_ymd: Optional[str]) -> Dict[str, List[str]]:
+        """
+        行内の入力欄を探すCSSセレクターを種類ごとに取得
+        
+        Args:
+            date_ymd: 日付（YYYYMMDD形式、不明な場合はNone）
+        
+        Returns:
+            入力欄の種類（attend, start, end, memo）ごとのCSSセレクターのリスト
+        """
+        return {field: self._row_field_selectors(field, date_ymd) for field in ROW_FIELD_SELECTORS}
+    
+    def _resolve_row_fields(self, tr_element, date_ymd: Optional[str]) -> Dict[str, Optional[object]]:
+        """
+        行内の入力欄をまとめて取得（要素ごとにfind_elementを繰り返さない）
+        
+        Args:
+            tr_element: 行のtr要素
+            date_ymd: 日付（YYYYMMDD形式、不明な場合はNone）
+        
+        Returns:
+            入力欄の種類（attend, start, end, memo）ごとのWebElement（見つからない場合はNone）
+        """
+        try:
+            fields = self.driver.execute_script(RESOLVE_ROW_FIELDS_SCRIPT, tr_element, self._row_selectors(date_ymd)) or {}
+        except Exception as e:
+            self.logger.warning(f"入力欄の取得中にエラー: {e}")
+            fields = {}
+        return {field: fields.get(field) for field in ROW_FIELD_SELECTORS}
+    
+    def _row_script_args(self, date_ymd: str, record: Dict[str, Optional[str]], attend_id: str) -> list:
+        """
+        FILL_ROW_SCRIPTに渡す1行分の引数を作成
+        
+        Args:
+            date_ymd: 日付（YYYYMMDD形式）
+            record: 勤怠レコード
+            attend_id: 出勤区分の値
+        
+        Returns:
+            引数のリスト
+        """
+        return [
+            f"tr-{date_ymd}-1",
+            self._row_selectors(date_ymd),
+            attend_id,
+            self._to_hhmm(record.get('start_time')),
+            self._to_hhmm(record.get('end_time')),
+            record.get('memo') or '',
+        ]
+    
+    def _fill_row_with_script(self, date_ymd: str, record: Dict[str, Optional[str]], attend_id: str) -> str:
+        """
+        1行分の勤怠データをJavaScriptでまとめて入力
+        
+        Args:
+            date_ymd: 日付（YYYYMMDD形式）
+            record: 勤怠レコード
+            attend_id: 出勤区分の値
+        
+        Returns:
+            FILL_ROW_SCRIPTの結果（'ok', 'existing', またはJavaScriptで入力しなかった理由）
+        """
+        return self.driver.execute_script(FILL_ROW_SCRIPT, *self._row_script_args(date_ymd, record, attend_id))
+    
+    def _flush_change_flags(self):
+        """保留中の変更フラグを1回のスクリプト実行でまとめて設定"""
+        if not self._pending_change_flags:
+            return
+        row_keys, self._pending_change_flags = self._pending_change_flags, []
+        try:
+            self.driver.execute_script(
+                "arguments[0].forEach((rowKey) => setAttendanceChangeFlag(rowKey));", row_keys
+            )
+            self.logger.info(f"変更フラグを設定しました（{len(row_keys)}行）")
+        except Exception as e:
+            self.logger.warning(f"変更フラグの設定に失敗: {e}")
+    
+    def _open_attendance_page(self):
+        """
+        勤怠入力ページを開く（既に開いている場合は再読み込みせず、読み込み完了を待つだけにする）
+        """
+        target_url = self.base_url or "https://app.recoru.in/ap/menuAttendance/"
+        current_url = self.driver.current_url
+        
+        # 現在のURLが正しいか確認（ベースURLが含まれているか）
+        if target_url in current_url or current_url.startswith("https://app.recoru.in/ap/menuAttendance"):
+            self.logger.info(f"既に正しいページにいます: {current_url}")
+        elif self.base_url:
+            self.logger.info(f"勤怠入力ページに遷移: {self.base_url}")
+            self.driver.get(self.base_url)
+        else:
+            # デフォルトの勤怠入力ページURL
+            self.logger.info("デフォルトの勤怠入力ページに遷移")
+            self.driver.get("https://app.recoru.in/ap/menuAttendance/")
+        # ページが読み込まれるまで待機（読み込み済みの場合はすぐに進む）
+        self._wait_for_attendance_ready()
+    
+    def input_attendance(self, record: Dict[str, Optional[str]], skip_reload: bool = False, defer_change_flag: bool = False,
+                         use_script: bool = True) -> bool:
         """
         1件の勤怠データを入力
         
         Args:
             record: 勤怠レコード（day, start_time, end_time, statusを含む）
             skip_reload: ページリロードをスキップするか（複数レコード入力時に使用）
+            defer_change_flag: 変更フラグをすぐに設定せず、_flush_change_flagsでまとめて設定するか（複数レコード入力時に使用）
+            use_script: 最初にJavaScriptで行の入力を試すか（一括入力で既に試した場合はFalseにして、項目ごとの入力のみ行う）
         
         Returns:
             入力成功時True、失敗時False
@@ -379,24 +765,7 @@ class RecoruClient:
             
             # 勤怠入力ページに遷移（skip_reloadがFalseの場合のみ、かつ現在のURLが正しくない場合のみ）
             if not skip_reload:
-                target_url = self.base_url or "https://app.recoru.in/ap/menuAttendance/"
-                current_url = self.driver.current_url
-                
-                # 現在のURLが正しいか確認（ベースURLが含まれているか）
-                if target_url in current_url or current_url.startswith("https://app.recoru.in/ap/menuAttendance"):
-                    self.logger.info(f"既に正しいページにいます: {current_url}")
-                    # ページが読み込まれるまで少し待機
-                    time.sleep(1)
-                else:
-                    # 正しいページにいない場合は遷移
-                    if self.base_url:
-                        self.logger.info(f"勤怠入力ページに遷移: {self.base_url}")
-                        self.driver.get(self.base_url)
-                    else:
-                        # デフォルトの勤怠入力ページURL
-                        self.logger.info("デフォルトの勤怠入力ページに遷移")
-                        self.driver.get("https://app.recoru.in/ap/menuAttendance/")
-                    time.sleep(2)
+                self._open_attendance_page()
             
             # 日（day）を取得
             day = record.get('day')
@@ -414,20 +783,43 @@ class RecoruClient:
             date_str = build_date_from_components(record)
             self.logger.info(f"勤怠データを入力中: 日={day_int} (日付={date_str or 'N/A'})")
             
+            # 日付・時刻の形式変換はここで1回だけ行い、以降はこの値を使う
+            record_date_ymd = self._to_date_ymd(date_str)
+            start_hhmm = self._to_hhmm(record.get('start_time'))
+            end_hhmm = self._to_hhmm(record.get('end_time'))
+            
+            # 日付が分かる場合は、行の検索から入力までをJavaScriptで1回で行う
+            # （入力欄が見つからないなどでJavaScriptで入力できなかった場合は、以下の要素ごとの入力を行う）
+            if record_date_ymd and use_script:
+                try:
+                    status = self._fill_row_with_script(record_date_ymd, record, '1')
+                    if status == 'ok':
+                        self.logger.info(f"勤怠データの入力が完了しました: {record_date_ymd}")
+                        return True
+                    if status == 'existing':
+                        self.logger.info(f"日 {day_int}: 既に入力があるため、スキップしました")
+                        return True
+                    self.logger.info(f"日 {day_int}: JavaScriptでの一括入力ができなかったため、項目ごとに入力します（{status}）")
+                except Exception as e:
+                    self.logger.warning(f"JavaScriptでの一括入力中にエラー: {e}")
+            
             # 日（day）で行を探す
             # HTMLの例: <label style="color: red;">1/2(金)</label> や <a onclick="...">1/2(金)</a>
             wait = WebDriverWait(self.driver, 10)
             tr_element = None
             
-            # 方法1: 日が表示されているラベルやリンクを探す（例: "1/2" や "1"）
-            # 月/日の形式（例: "1/2"）を探す
-            day_patterns = [
-                f"{day_int}/",  # "1/" で始まる
-                f"/{day_int}",  # "/2" で終わる
-                f"{day_int}(",  # "1(" で始まる（曜日が続く）
-            ]
+            # 方法1: 日付が分かる場合は、tr要素のIDで探す（YYYYMMDD形式、1回のID検索で済むため最初に試す）
+            if record_date_ymd:
+                tr_id = f"tr-{record_date_ymd}-1"
+                try:
+                    tr_element = self.driver.find_element(By.ID, tr_id)
+                    self.logger.info(f"行を発見（ID）: {tr_id}")
+                except NoSuchElementException:
+                    pass
             
-            for pattern in day_patterns:
+            # 方法2: まだ見つからない場合は、日が表示されているラベルやリンクを探す（例: "1/2" や "1"）
+            # ページの読み込みが終わっていない場合に備えて、ここでは要素が現れるまで待つ
+            if tr_element is None:
                 try:
                     # 日が含まれるリンクやラベルを探す
                     day_element = wait.until(
@@ -437,39 +829,20 @@ class RecoruClient:
                         ))
                     )
                     tr_element = day_element.find_element(By.XPATH, "./ancestor::tr")
-                    self.logger.info(f"日 {day_int} の行を発見（パターン: {pattern}）")
-                    break
+                    self.logger.info(f"日 {day_int} の行を発見（ラベル・リンク）")
                 except (TimeoutException, NoSuchElementException):
-                    continue
-            
-            # 方法2: まだ見つからない場合は、tr要素のIDで探す（YYYYMMDD形式）
-            if tr_element is None:
-                if date_str:
-                    try:
-                        from datetime import datetime
-                        date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-                        date_ymd = date_obj.strftime('%Y%m%d')
-                        tr_id = f"tr-{date_ymd}-1"
-                        tr_element = wait.until(
-                            EC.presence_of_element_located((By.ID, tr_id))
-                        )
-                        self.logger.info(f"行を発見（ID）: {tr_id}")
-                    except (ValueError, TimeoutException):
-                        pass
+                    pass
             
             # 方法3: 日付リンクで探す
-            if tr_element is None and date_str:
+            if tr_element is None and record_date_ymd:
                 try:
-                    from datetime import datetime
-                    date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-                    date_ymd = date_obj.strftime('%Y%m%d')
                     date_link = self.driver.find_element(
                         By.XPATH, 
-                        f"//a[contains(@onclick, '{date_ymd}')]"
+                        f"//a[contains(@onclick, '{record_date_ymd}')]"
                     )
                     tr_element = date_link.find_element(By.XPATH, "./ancestor::tr")
-                    self.logger.info(f"日付リンクから行を発見: {date_ymd}")
-                except (ValueError, NoSuchElementException):
+                    self.logger.info(f"日付リンクから行を発見: {record_date_ymd}")
+                except NoSuchElementException:
                     pass
             
             if tr_element is None:
@@ -491,71 +864,28 @@ class RecoruClient:
                 date_ymd = None
             
             # date_ymdが取得できない場合は、recordから構築
-            if not date_ymd and date_str:
-                try:
-                    from datetime import datetime
-                    date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-                    date_ymd = date_obj.strftime('%Y%m%d')
-                except ValueError:
-                    date_ymd = None
+            if not date_ymd:
+                date_ymd = record_date_ymd
+            
+            # 行内の入力欄を1回でまとめて取得し、以降の確認・入力で使い回す
+            fields = self._resolve_row_fields(tr_element, date_ymd)
             
             # 既に入力があるか確認（出勤時刻または退勤時刻が既に入力されている場合）
             has_existing_input = False
             try:
                 # 出勤時刻フィールドを確認
-                start_field = None
-                selectors = []
-                if date_ymd:
-                    selectors.extend([
-                        f"input.ID-worktimeStart-{date_ymd}-1",
-                        f"input[name*='worktimeStart'][name*='{date_ymd}']",
-                    ])
-                selectors.extend([
-                    "input[name*='worktimeStart']",
-                    "input.worktimeStart",
-                    "input[class*='worktimeStart']"
-                ])
-                
-                for selector in selectors:
-                    try:
-                        start_field = tr_element.find_element(By.CSS_SELECTOR, selector)
-                        break
-                    except NoSuchElementException:
-                        continue
-                
-                if start_field:
-                    start_value = start_field.get_attribute('value')
+                if fields['start']:
+                    start_value = fields['start'].get_attribute('value')
                     if start_value and start_value.strip():
                         has_existing_input = True
                         self.logger.info(f"日 {day_int}: 出勤時刻に既に入力があります（{start_value}）。スキップします。")
                 
                 # 退勤時刻フィールドを確認
-                if not has_existing_input:
-                    end_field = None
-                    selectors = []
-                    if date_ymd:
-                        selectors.extend([
-                            f"input.ID-worktimeEnd-{date_ymd}-1",
-                            f"input[name*='worktimeEnd'][name*='{date_ymd}']",
-                        ])
-                    selectors.extend([
-                        "input[name*='worktimeEnd']",
-                        "input.worktimeEnd",
-                        "input[class*='worktimeEnd']"
-                    ])
-                    
-                    for selector in selectors:
-                        try:
-                            end_field = tr_element.find_element(By.CSS_SELECTOR, selector)
-                            break
-                        except NoSuchElementException:
-                            continue
-                    
-                    if end_field:
-                        end_value = end_field.get_attribute('value')
-                        if end_value and end_value.strip():
-                            has_existing_input = True
-                            self.logger.info(f"日 {day_int}: 退勤時刻に既に入力があります（{end_value}）。スキップします。")
+                if not has_existing_input and fields['end']:
+                    end_value = fields['end'].get_attribute('value')
+                    if end_value and end_value.strip():
+                        has_existing_input = True
+                        self.logger.info(f"日 {day_int}: 退勤時刻に既に入力があります（{end_value}）。スキップします。")
                 
             except Exception as e:
                 self.logger.warning(f"既存入力の確認中にエラー: {e}")
@@ -570,67 +900,25 @@ class RecoruClient:
             
             if attend_id:
                 try:
-                    # 行内のselect要素を探す（複数のパターンを試す）
-                    attend_select = None
-                    selectors = []
-                    if date_ymd:
-                        selectors.extend([
-                            f"select.ID-attendKbn-{date_ymd}-1",
-                            f"select[name*='attendId'][name*='{date_ymd}']",
-                        ])
-                    selectors.extend([
-                        "select[name*='attendId']",
-                        "select.ID-attendKbn",
-                        "select[class*='attendKbn']"
-                    ])
-                    
-                    for selector in selectors:
-                        try:
-                            attend_select = tr_element.find_element(By.CSS_SELECTOR, selector)
-                            break
-                        except NoSuchElementException:
-                            continue
-                    
-                    if attend_select:
-                        from selenium.webdriver.support.ui import Select
-                        select = Select(attend_select)
-                        select.select_by_value(attend_id)
-                        self.logger.info(f"出勤区分を選択: {attend_id}")
-                        time.sleep(0.5)
+                    if fields['attend']:
+                        # Selectクラスは選択肢の取得・クリックでコマンドを複数回送るため、JavaScriptで1回で選択する
+                        if self.driver.execute_script(SELECT_VALUE_SCRIPT, fields['attend'], attend_id):
+                            self.logger.info(f"出勤区分を選択: {attend_id}")
+                            time.sleep(0.5)
+                        else:
+                            self.logger.warning(f"出勤区分の選択肢が見つかりませんでした: {attend_id}")
                     else:
                         self.logger.warning("出勤区分のselect要素が見つかりませんでした")
                 except Exception as e:
                     self.logger.warning(f"出勤区分の選択中にエラー: {e}")
             
             # 出勤時刻入力
-            if record.get('start_time'):
+            if start_hhmm:
                 try:
-                    # 時刻をHHMM形式に変換（HH:MM -> HHMM）
-                    start_time = record['start_time'].replace(':', '')
-                    start_field = None
-                    selectors = []
-                    if date_ymd:
-                        selectors.extend([
-                            f"input.ID-worktimeStart-{date_ymd}-1",
-                            f"input[name*='worktimeStart'][name*='{date_ymd}']",
-                        ])
-                    selectors.extend([
-                        "input[name*='worktimeStart']",
-                        "input.worktimeStart",
-                        "input[class*='worktimeStart']"
-                    ])
-                    
-                    for selector in selectors:
-                        try:
-                            start_field = tr_element.find_element(By.CSS_SELECTOR, selector)
-                            break
-                        except NoSuchElementException:
-                            continue
-                    
-                    if start_field:
-                        start_field.clear()
-                        start_field.send_keys(start_time)
-                        self.logger.info(f"出勤時刻を入力: {start_time}")
+                    if fields['start']:
+                        fields['start'].clear()
+                        fields['start'].send_keys(start_hhmm)
+                        self.logger.info(f"出勤時刻を入力: {start_hhmm}")
                         time.sleep(0.5)
                     else:
                         self.logger.warning("出勤時刻フィールドが見つかりませんでした")
@@ -638,34 +926,12 @@ class RecoruClient:
                     self.logger.warning(f"出勤時刻入力中にエラー: {e}")
             
             # 退勤時刻入力
-            if record.get('end_time'):
+            if end_hhmm:
                 try:
-                    # 時刻をHHMM形式に変換（HH:MM -> HHMM）
-                    end_time = record['end_time'].replace(':', '')
-                    end_field = None
-                    selectors = []
-                    if date_ymd:
-                        selectors.extend([
-                            f"input.ID-worktimeEnd-{date_ymd}-1",
-                            f"input[name*='worktimeEnd'][name*='{date_ymd}']",
-                        ])
-                    selectors.extend([
-                        "input[name*='worktimeEnd']",
-                        "input.worktimeEnd",
-                        "input[class*='worktimeEnd']"
-                    ])
-                    
-                    for selector in selectors:
-                        try:
-                            end_field = tr_element.find_element(By.CSS_SELECTOR, selector)
-                            break
-                        except NoSuchElementException:
-                            continue
-                    
-                    if end_field:
-                        end_field.clear()
-                        end_field.send_keys(end_time)
-                        self.logger.info(f"退勤時刻を入力: {end_time}")
+                    if fields['end']:
+                        fields['end'].clear()
+                        fields['end'].send_keys(end_hhmm)
+                        self.logger.info(f"退勤時刻を入力: {end_hhmm}")
                         time.sleep(0.5)
                     else:
                         self.logger.warning("退勤時刻フィールドが見つかりませんでした")
@@ -675,29 +941,9 @@ class RecoruClient:
             # メモ入力（オプション）
             if record.get('memo'):
                 try:
-                    memo_field = None
-                    selectors = []
-                    if date_ymd:
-                        selectors.extend([
-                            f"input.ID-worktimeMemo-{date_ymd}-1",
-                            f"input[name*='worktimeMemo'][name*='{date_ymd}']",
-                        ])
-                    selectors.extend([
-                        "input[name*='worktimeMemo']",
-                        "input.worktimeMemo",
-                        "input[class*='worktimeMemo']"
-                    ])
-                    
-                    for selector in selectors:
-                        try:
-                            memo_field = tr_element.find_element(By.CSS_SELECTOR, selector)
-                            break
-                        except NoSuchElementException:
-                            continue
-                    
-                    if memo_field:
-                        memo_field.clear()
-                        memo_field.send_keys(record['memo'])
+                    if fields['memo']:
+                        fields['memo'].clear()
+                        fields['memo'].send_keys(record['memo'])
                         self.logger.info("メモを入力しました")
                         time.sleep(0.5)
                     else:
@@ -706,12 +952,13 @@ class RecoruClient:
                     self.logger.warning(f"メモ入力中にエラー: {e}")
             
             # 変更フラグを設定（onblurイベントをトリガー）
-            if date_ymd:
+            if date_ymd and defer_change_flag:
+                self._pending_change_flags.append(f"{date_ymd}-1")
+            elif date_ymd:
                 try:
                     # JavaScriptでsetAttendanceChangeFlagを呼び出す
                     self.driver.execute_script(f"setAttendanceChangeFlag('{date_ymd}-1');")
                     self.logger.info("変更フラグを設定しました")
-                    time.sleep(0.5)
                 except Exception as e:
                     self.logger.warning(f"変更フラグの設定に失敗: {e}")
             
@@ -744,28 +991,55 @@ class RecoruClient:
         if not records:
             return results
         
-        # 最初の1回だけページを読み込む
-        self.logger.info(f"勤怠入力ページに遷移（{len(records)}件のレコードを入力します）")
-        if self.base_url:
-            self.driver.get(self.base_url)
-        else:
-            self.driver.get("https://app.recoru.in/ap/menuAttendance/")
-        time.sleep(2)
+        # 勤怠入力ページを開く（login()で既に開いている場合は再読み込みしない）
+        self.logger.info(f"{len(records)}件のレコードを入力します")
+        self._open_attendance_page()
+        
+        # 日付が分かるレコードは、JavaScriptで全行をまとめて入力する（WebDriverへのコマンド送信は1回）
+        # 日付はレコードごとに1回だけ組み立て、行の特定と結果の記録の両方に使う
+        # 年・月のないレコードの現在日時も1回だけ取得し、全レコードで同じ年月を使う
+        now = datetime.now()
+        date_strs = [build_date_from_components(record, now) for record in records]
+        statuses = [None] * len(records)
+        script_indices = []
+        script_args = []
+        for idx, record in enumerate(records):
+            date_ymd = self._to_date_ymd(date_strs[idx])
+            if date_ymd:
+                script_indices.append(idx)
+                script_args.append(self._row_script_args(date_ymd, record, '1'))
+        if script_args:
+            try:
+                for idx, status in zip(script_indices, self.driver.execute_script(FILL_ROWS_SCRIPT, script_args)):
+                    statuses[idx] = status
+            except Exception as e:
+                self.logger.warning(f"JavaScriptでの一括入力中にエラー: {e}")
         
-        # 各レコードを入力（ページリロードなし）
+        # JavaScriptで入力できなかったレコードのみ1件ずつ入力する（ページリロードなし）
         for idx, record in enumerate(records):
-            self.logger.info(f"レコード {idx + 1}/{len(records)} を入力中...")
-            success = self.input_attendance(record, skip_reload=True)
+            status = statuses[idx]
+            if status == 'ok':
+                self.logger.info(f"レコード {idx + 1}/{len(records)} を入力しました: 日={record.get('day')}")
+                success = True
+            elif status == 'existing':
+                self.logger.info(f"レコード {idx + 1}/{len(records)}: 日 {record.get('day')} は既に入力があるため、スキップしました")
+                success = True
+            else:
+                if status is not None:
+                    self.logger.info(f"レコード {idx + 1}/{len(records)}: JavaScriptでの一括入力ができなかったため、項目ごとに入力します（{status}）")
+                self.logger.info(f"レコード {idx + 1}/{len(records)} を入力中...")
+                # 一括入力のJavaScriptで処理済みの行は、同じJavaScriptを再実行せずに項目ごとに入力する
+                success = self.input_attendance(record, skip_reload=True, defer_change_flag=True, use_script=status is None)
             if success:
-                results['success'].append(build_date_from_components(record))
+                results['success'].append(date_strs[idx])
             else:
                 results['failed'].append({
                     'date': record.get('date'),
                     'record': record
                 })
-            
-            # レート制限を避けるために少し待機
-            time.sleep(0.5)
+        
+        # 1件ずつ入力した行の変更フラグは最後にまとめて設定する
+        self._flush_change_flags()
         
         return results
     
@@ -3,10 +3,76 @@
 """
 import re
 from datetime import datetime
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, Union, Tuple
+from functools import lru_cache
 import json
 import os
 
+# 日付パターンの種類（グループの並び）
+_DATE_YMD = 0    # 年, 月, 日
+_DATE_MDY = 1    # 月, 日, 年
+_DATE_MD = 2     # 月, 日（年なし）
+
+# 日付のパターン（上から順に試す。モジュール読み込み時にコンパイルしておく）
+# (パターン, 種類)
+_DATE_PATTERNS = (
+    (re.compile(r'(\d{4})[/-](\d{1,2})[/-](\d{1,2})'), _DATE_YMD),  # 2024/01/01, 2024-01-01
+    (re.compile(r'(\d{1,2})[/-](\d{1,2})[/-](\d{4})'), _DATE_MDY),  # 01/01/2024
+    (re.compile(r'(\d{1,2})[/-](\d{1,2})'), _DATE_MD),              # 9/30, 01/01 (月/日のみ、年は現在年を使用)
+    (re.compile(r'(\d{4})年(\d{1,2})月(\d{1,2})日'), _DATE_YMD),     # 2024年1月1日
+)
+
+# 月/日のみの日付の場合に、テキストから年を探すパターン（例: "2025生" から 2025 を取得）
+_YEAR_PATTERN = re.compile(r'(\d{4})')
+
+# HH:MM形式の時刻（datetime.strptimeの%H・%Mと同じ範囲・桁数）
+_HM_PATTERN = re.compile(r'(2[0-3]|[0-1]\d|\d):([0-5]\d|\d)')
+
+# よく使われる休憩時間（4時間までの15分刻み）の分数（休憩時間は種類が少ないため、解析せずに表から引く）
+_BREAK_MINUTES = {f"{minutes // 60:02d}:{minutes % 60:02d}": minutes for minutes in range(0, 4 * 60 + 1, 15)}
+
+# 時刻のパターン（上から順に試す）
+# (パターン, 「時分」表記か, HHMM形式か)
+_TIME_PATTERNS = (
+    (re.compile(r'(\d{1,2})\.(\d{2})'), False, False),  # HH.MM (ピリオド区切り)
+    (re.compile(r'(\d{1,2}):(\d{2})'), False, False),   # HH:MM
+    (re.compile(r'(\d{1,2})時(\d{2})分'), True, False),  # HH時MM分
+    (re.compile(r'(\d{4})'), False, True),              # HHMM
+)
+
+
+def _is_iso_date(s: str) -> bool:
+    """
+    先頭10文字がYYYY-MM-DD形式（半角数字）か判定
+    
+    Args:
+        s: 日付文字列
+    
+    Returns:
+        YYYY-MM-DD形式の場合True
+    """
+    head = s[:10]
+    return (
+        len(head) == 10 and head.isascii() and head[4] == '-' and head[7] == '-'
+        and head[:4].isdigit() and head[5:7].isdigit() and head[8:].isdigit()
+    )
+
+
+def _is_hhmm(s: str) -> bool:
+    """
+    HH:MM形式（半角数字）か判定
+    
+    Args:
+        s: 時刻文字列
+    
+    Returns:
+        HH:MM形式の場合True
+    """
+    return (
+        len(s) == 5 and s.isascii() and s[2] == ':'
+        and s[:2].isdigit() and s[3:].isdigit()
+    )
+
 
 def normalize_date(date_str: str) -> Optional[str]:
     """
@@ -21,52 +87,49 @@ def normalize_date(date_str: str) -> Optional[str]:
     if not date_str:
         return None
     
-    # よくある日付形式のパターン
-    patterns = [
-        (r'(\d{4})[/-](\d{1,2})[/-](\d{1,2})', '%Y-%m-%d'),  # 2024/01/01, 2024-01-01
-        (r'(\d{1,2})[/-](\d{1,2})[/-](\d{4})', '%m-%d-%Y'),  # 01/01/2024
-        (r'(\d{1,2})[/-](\d{1,2})', '%m-%d'),                # 9/30, 01/01 (月/日のみ、年は現在年を使用)
-        (r'(\d{4})年(\d{1,2})月(\d{1,2})日', '%Y-%m-%d'),     # 2024年1月1日
-    ]
+    result = _normalize_date_cached(str(date_str))
+    if isinstance(result, tuple):
+        # 年のない月/日のみの形式は、キャッシュせずに呼び出し時点の年を使う
+        month, day = result
+        return f"{datetime.now().year}-{int(month):02d}-{int(day):02d}"
+    return result
+
+
+@lru_cache(maxsize=4096)
+def _normalize_date_cached(date_str: str) -> Union[str, Tuple[str, str], None]:
+    """
+    日付文字列をYYYY-MM-DD形式に正規化（同じ文字列は結果を使い回す）
     
-    for pattern, date_format in patterns:
-        match = re.search(pattern, str(date_str))
-        if match:
-            try:
-                if '年' in pattern:
-                    year, month, day = match.groups()
-                    return f"{year}-{int(month):02d}-{int(day):02d}"
-                else:
-                    parts = match.groups()
-                    if len(parts) == 2 and '%m-%d' in date_format:
-                        # 月/日のみの形式（例: 9/30）
-                        month, day = parts
-                        # 現在の年を使用（またはテキストから年を取得）
-                        current_year = datetime.now().year
-                        # テキストから年を探す（例: "2025生" から 2025 を取得）
-                        year_match = re.search(r'(\d{4})', str(date_str))
-                        if year_match:
-                            year = year_match.group(1)
-                        else:
-                            year = str(current_year)
-                        return f"{year}-{int(month):02d}-{int(day):02d}"
-                    elif len(parts[0]) == 4:  # YYYY-MM-DD形式
-                        year, month, day = parts
-                        return f"{year}-{int(month):02d}-{int(day):02d}"
-                    else:  # MM-DD-YYYY形式
-                        month, day, year = parts
-                        return f"{year}-{int(month):02d}-{int(day):02d}"
-            except (ValueError, IndexError):
-                continue
+    Args:
+        date_str: 日付文字列
     
-    # パース可能な形式を試す
-    for fmt in ['%Y-%m-%d', '%Y/%m/%d', '%m/%d/%Y', '%d/%m/%Y']:
-        try:
-            dt = datetime.strptime(str(date_str).strip(), fmt)
-            return dt.strftime('%Y-%m-%d')
-        except ValueError:
-            continue
+    Returns:
+        正規化された日付文字列、年のない月/日のみの形式の場合は(月, 日)のタプル、失敗時はNone
+    """
+    # 既にYYYY-MM-DD形式の場合は正規表現を使わずにそのまま返す（後ろに時刻などが続く場合は日付部分のみ）
+    if _is_iso_date(date_str):
+        return date_str[:10]
+    
+    for pattern, kind in _DATE_PATTERNS:
+        match = pattern.search(date_str)
+        if match:
+            if kind == _DATE_YMD:  # YYYY-MM-DD形式、YYYY年MM月DD日形式
+                year, month, day = match.groups()
+            elif kind == _DATE_MDY:  # MM-DD-YYYY形式
+                month, day, year = match.groups()
+            else:
+                # 月/日のみの形式（例: 9/30）
+                month, day = match.groups()
+                # テキストから年を探す（例: "2025生" から 2025 を取得）
+                year_match = _YEAR_PATTERN.search(date_str)
+                if not year_match:
+                    # 年がない場合は現在の年を使用する（呼び出し側で補う）
+                    return month, day
+                year = year_match.group(1)
+            return f"{year}-{int(month):02d}-{int(day):02d}"
     
+    # どのパターンにも一致しない場合は日付として扱わない
+    # （strptimeで読める形式（%Y-%m-%d, %Y/%m/%d, %m/%d/%Y, %d/%m/%Y）は必ず月/日のパターンに一致するため、strptimeは試さない）
     return None
 
 
@@ -83,29 +146,37 @@ def normalize_time(time_str: str) -> Optional[str]:
     if not time_str:
         return None
     
-    time_str = str(time_str).strip()
+    return _normalize_time_cached(str(time_str))
+
+
+@lru_cache(maxsize=4096)
+def _normalize_time_cached(time_str: str) -> Optional[str]:
+    """
+    時刻文字列をHH:MM形式に正規化（同じ文字列は結果を使い回す）
     
-    # 時刻パターン（ピリオド区切りも追加）
-    patterns = [
-        r'(\d{1,2})\.(\d{2})',          # HH.MM (ピリオド区切り)
-        r'(\d{1,2}):(\d{2})',           # HH:MM
-        r'(\d{1,2})時(\d{2})分',         # HH時MM分
-        r'(\d{4})',                      # HHMM
-    ]
+    Args:
+        time_str: 時刻文字列
     
-    for pattern in patterns:
-        match = re.search(pattern, time_str)
+    Returns:
+        正規化された時刻文字列（HH:MM形式）、失敗時はNone
+    """
+    time_str = time_str.strip()
+    
+    # 既にHH:MM形式で範囲内の場合は正規表現を使わずにそのまま返す
+    if _is_hhmm(time_str) and time_str[:2] <= '23' and time_str[3:] <= '59':
+        return time_str
+    
+    for pattern, is_kanji, is_hhmm in _TIME_PATTERNS:
+        match = pattern.search(time_str)
         if match:
             try:
-                if '時' in pattern:
+                if is_kanji:
                     hour, minute = match.groups()
                     hour = int(hour)
                     minute = int(minute)
-                elif len(match.group(0)) == 4 and '.' not in pattern and ':' not in pattern:
-                    # HHMM形式
-                    time_str_clean = match.group(0)
-                    hour = int(time_str_clean[:2])
-                    minute = int(time_str_clean[2:])
+                elif is_hhmm:
+                    # HHMM形式（4桁を1回で整数にして時・分に分ける。\dは全角数字なども含むためint()で変換する）
+                    hour, minute = divmod(int(match.group(0)), 100)
                 else:
                     hour, minute = match.groups()
                     hour = int(hour)
@@ -136,6 +207,27 @@ def load_config(config_path: str = "config.json") -> Dict[str, Any]:
         return json.load(f)
 
 
+@lru_cache(maxsize=4096)
+def time_to_minutes(time_str: str) -> int:
+    """
+    HH:MM形式の時刻を0時からの分数に変換（同じ時刻文字列は結果を使い回す）
+    
+    Args:
+        time_str: 時刻文字列
+    
+    Returns:
+        0時からの分数
+    
+    Raises:
+        ValueError: HH:MM形式でない場合（datetime.strptime(time_str, '%H:%M')と同じ判定）
+    """
+    # strptimeより速いため、strptimeが%H:%Mに使うものと同じ正規表現で直接チェックする
+    match = _HM_PATTERN.fullmatch(time_str)
+    if match is None:
+        raise ValueError(f"時刻の形式が不正です: {time_str}")
+    return int(match.group(1)) * 60 + int(match.group(2))
+
+
 def calculate_work_hours(start_time: str, end_time: str, break_time: str = "00:00") -> Optional[float]:
     """
     勤務時間を計算（時間単位）
@@ -149,24 +241,24 @@ def calculate_work_hours(start_time: str, end_time: str, break_time: str = "00:0
         勤務時間（時間単位）、計算失敗時はNone
     """
     try:
-        start = datetime.strptime(start_time, '%H:%M')
-        end = datetime.strptime(end_time, '%H:%M')
-        break_dt = datetime.strptime(break_time, '%H:%M')
+        # strptimeでdatetimeを作らず、分単位の整数で計算する
+        start = time_to_minutes(start_time)
+        end = time_to_minutes(end_time)
+        break_minutes = _BREAK_MINUTES.get(break_time)
+        if break_minutes is None:
+            break_minutes = time_to_minutes(break_time)
         
         # 日をまたぐ場合の処理
         if end < start:
-            end = datetime.strptime(end_time, '%H:%M').replace(day=2)
-        
-        work_minutes = (end - start).total_seconds() / 60
-        break_minutes = (break_dt - datetime.strptime("00:00", '%H:%M')).total_seconds() / 60
+            end += 24 * 60
         
-        work_hours = (work_minutes - break_minutes) / 60
+        work_hours = (end - start - break_minutes) / 60
         return round(work_hours, 2)
     except (ValueError, AttributeError):
         return None
 
 
-def build_date_from_components(record: Dict[str, Union[int, Optional[str]]]) -> Optional[str]:
+def build_date_from_components(record: Dict[str, Union[int, Optional[str]]], now: Optional[datetime] = None) -> Optional[str]:
     if record.get('date'):
         return record['date']
     day = record.get('day')
@@ -174,13 +266,15 @@ def build_date_from_components(record: Dict[str, Union[int, Optional[str]]]) ->
         return None
     year = record.get('year')
     month = record.get('month')
-    now = datetime.now()
-    if year is None:
-        year = now.year
-    if month is None:
-        month = now.month
+    # 年・月が不足している場合のみ現在日時を使う（複数レコードをまとめて処理する場合は呼び出し側でnowを1回だけ取得して渡す）
+    if year is None or month is None:
+        if now is None:
+            now = datetime.now()
+        if year is None:
+            year = now.year
+        if month is None:
+            month = now.month
     try:
         return f"{year}-{int(month):02d}-{int(day):02d}"
     except Exception:
         return None
-